@@ -0,0 +1,229 @@
+"""
+Load test of the auth and organisation endpoints.
+
+    python -m benchmarks.api --users 2000 --organisations 200 --members 50 --output baseline.json
+    python -m benchmarks.api ... --compare baseline.json
+
+Seeds a throwaway test database (SQLite, or the PostgreSQL server the
+DB_* settings point at), then sends `--runs` requests to each endpoint
+from `--concurrency` threads through the WSGI handler. Reports
+throughput, latency percentiles and queries per request (from
+users.metrics) as JSON. With `--compare`, exits non-zero when an endpoint
+is slower than the baseline by more than `--threshold` or issues more
+queries.
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+
+from benchmarks.utils import setup, summarize, test_database, wsgi_call
+
+PASSWORD = 'benchmark-password'
+
+
+def seed(users, organisations, members, batch_size=5000):
+    from django.contrib.auth.hashers import make_password
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from organisations.models import Organisation
+    from users.models import User
+
+    # One hash shared by every seeded user keeps seeding fast
+    password = make_password(PASSWORD)
+    created = User.objects.bulk_create(
+        [
+            User(email=f'user{i}@example.com', firstName='User', lastName=str(i), phone='0', password=password)
+            for i in range(users)
+        ],
+        batch_size=batch_size,
+    )
+    orgs = Organisation.objects.bulk_create(
+        [Organisation(name=f'Organisation {i}', description='Benchmark') for i in range(organisations)],
+        batch_size=batch_size,
+    )
+
+    # The first user belongs to every organisation; the others are spread
+    # round-robin so each has `members` members
+    through = Organisation.users.through
+    links = {(org.pk, created[0].pk) for org in orgs}
+    others = itertools.cycle(created[1:] or created)
+    for org in orgs:
+        for _ in range(members - 1):
+            links.add((org.pk, next(others).pk))
+    through.objects.bulk_create(
+        [through(organisation_id=org_id, user_id=user_id) for org_id, user_id in links],
+        batch_size=batch_size,
+    )
+
+    token = f'Bearer {RefreshToken.for_user(created[0]).access_token}'
+    return created, orgs, token
+
+
+def endpoints(users, orgs, token):
+    user, org = users[0], orgs[0]
+    auth = {'Authorization': token}
+    counter = itertools.count()
+
+    def register():
+        n = next(counter)
+        return 'POST', '/auth/register', {}, {
+            'firstName': 'New', 'lastName': str(n), 'email': f'new{n}@example.com',
+            'password': PASSWORD, 'phone': '0',
+        }
+
+    return {
+        'register_user': register,
+        'login_user': lambda: ('POST', '/auth/login', {}, {'email': user.email, 'password': PASSWORD}),
+        'user_detail': lambda: ('GET', f'/api/users/{user.pk}', auth, None),
+        'organisation_list': lambda: ('GET', '/api/organisations', auth, None),
+        'organisation_page': lambda: ('GET', '/api/organisations?limit=50', auth, None),
+        'organisation_detail': lambda: ('GET', f'/api/organisations/{org.pk}', auth, None),
+        'organisation_batch': lambda: (
+            'POST', '/api/organisations/batch', auth, {'ids': [str(org.pk) for org in orgs[:50]]},
+        ),
+        'user_batch': lambda: ('GET', f'/api/users/batch?ids={",".join(str(user.pk) for user in users[:50])}', auth, None),
+        'organisation_members': lambda: ('GET', f'/api/organisations/{org.pk}/users?limit=100&count=true', auth, None),
+        'add_user_to_organisation': lambda: (
+            'POST', f'/api/organisations/{org.pk}/users', auth, {'userId': str(random.choice(users).pk)},
+        ),
+    }
+
+
+def run_endpoint(handler, make_request, runs, concurrency):
+    from django.db import connections
+
+    remaining = iter(range(runs))
+    lock = threading.Lock()
+    samples = []
+    failures = []
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                method, path, headers, body = make_request()
+                start = time.perf_counter()
+                status, content = wsgi_call(handler, method, path, headers, body)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    samples.append(elapsed)
+                    if status >= 400:
+                        failures.append(status)
+        finally:
+            # Persistent connections would otherwise outlive the test database
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, failures, time.perf_counter() - start
+
+
+# URL names of the endpoints that share a route with another
+VIEW_NAMES = {
+    'organisation_page': 'organisation_list_create',
+    'organisation_list': 'organisation_list_create',
+    'organisation_members': 'add_user_to_organisation',
+}
+
+
+def run(args):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+
+    from users.metrics import REQUEST_DB_QUERIES
+
+    handler = WSGIHandler()
+    users, orgs, token = seed(args.users, args.organisations, args.members)
+    requests = endpoints(users, orgs, token)
+    results = {}
+    for name in args.endpoints or requests:
+        view = VIEW_NAMES.get(name, name)
+        queries, count = REQUEST_DB_QUERIES.sum(view=view), REQUEST_DB_QUERIES.count(view=view)
+        samples, failures, elapsed = run_endpoint(handler, requests[name], args.runs, args.concurrency)
+        requests_seen = REQUEST_DB_QUERIES.count(view=view) - count
+        results[name] = {
+            **summarize(samples),
+            'requests_per_second': round(len(samples) / elapsed, 1),
+            'queries_per_request': round((REQUEST_DB_QUERIES.sum(view=view) - queries) / requests_seen, 2) if requests_seen else None,
+            'errors': len(failures),
+        }
+    return {
+        'database': connection.vendor,
+        'config': {
+            'users': args.users,
+            'organisations': args.organisations,
+            'members': args.members,
+            'runs': args.runs,
+            'concurrency': args.concurrency,
+        },
+        'endpoints': results,
+    }
+
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(f'{name}: {metric} {previous[metric]} -> {current[metric]}')
+        # Whole queries only: cache warm-up makes the fraction vary between runs
+        if round(previous.get('queries_per_request') or 0) < round(current.get('queries_per_request') or 0):
+            regressions.append(
+                f'{name}: queries_per_request {previous["queries_per_request"]} -> {current["queries_per_request"]}'
+            )
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f'{name}: errors {previous.get("errors", 0)} -> {current["errors"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--organisations', type=int, default=100)
+    parser.add_argument('--members', type=int, default=20, help='members per organisation')
+    parser.add_argument('--runs', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--endpoints', nargs='+', help='only run these endpoints')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed latency increase (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    # The login and registration throttles would answer most requests with
+    # a 429 and report the rejection's cost instead of the endpoint's
+    with test_database(on_disk=True), override_settings(ALLOWED_HOSTS=['*'], AUTH_THROTTLE={'ENABLED': False}):
+        report = run(args)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
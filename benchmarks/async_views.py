@@ -0,0 +1,122 @@
+"""
+Throughput of the async views against the sync views under concurrent load.
+
+    python -m benchmarks.async_views --requests 500 --concurrency 50 --db-latency 20
+
+The sync views are driven from a pool of `--concurrency` threads (one per
+in-flight request, as a threaded WSGI/ASGI worker would); the async views
+from a single event loop with `--concurrency` requests in flight.
+`--db-latency` adds a sleep to every query to mimic a remote database.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.urls import include, path
+
+from benchmarks.utils import setup, summarize, test_database
+
+urlpatterns = []
+
+
+def install_latency(seconds):
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    def sleeper(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def add_wrapper(connection, **kwargs):
+        connection.execute_wrappers.append(sleeper)
+
+    connection_created.connect(add_wrapper, weak=False)
+    for connection in connections.all():
+        if connection.connection is not None:
+            add_wrapper(connection)
+
+
+def seed(organisations):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from organisations.models import Organisation
+    from users.models import User
+
+    user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+    orgs = Organisation.objects.bulk_create(Organisation(name=f'Org {i}') for i in range(organisations))
+    user.organisations.add(*orgs)
+    return f'Bearer {RefreshToken.for_user(user).access_token}', [f'/api/organisations/{orgs[0].pk}', '/api/organisations']
+
+
+def run_sync(urls, token, requests, concurrency):
+    from django.test import Client
+
+    def fetch(i):
+        start = time.perf_counter()
+        response = Client().get('/sync' + urls[i % len(urls)], HTTP_AUTHORIZATION=token)
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        samples = list(pool.map(fetch, range(requests)))
+    return samples, time.perf_counter() - start
+
+
+async def run_async(urls, token, requests, concurrency):
+    from asgiref.sync import ThreadSensitiveContext
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    limit = asyncio.Semaphore(concurrency)
+
+    async def fetch(i):
+        # ASGIHandler gives every request its own context, so the ORM calls
+        # of concurrent requests run on separate threads; AsyncClient doesn't
+        async with limit, ThreadSensitiveContext():
+            start = time.perf_counter()
+            response = await client.get(urls[i % len(urls)], headers={'Authorization': token})
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    samples = await asyncio.gather(*(fetch(i) for i in range(requests)))
+    return samples, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=30)
+    parser.add_argument('--organisations', type=int, default=20)
+    parser.add_argument('--db-latency', type=float, default=0, help='milliseconds added to every query')
+    args = parser.parse_args()
+
+    setup()
+    from django.test.utils import override_settings
+
+    from users.urls import async_urlpatterns, sync_urlpatterns
+
+    urlpatterns[:] = [
+        path('', include(async_urlpatterns)),
+        path('sync/', include((sync_urlpatterns, 'sync'))),
+    ]
+    with test_database(), override_settings(ROOT_URLCONF=__name__, ALLOWED_HOSTS=['*']):
+        token, urls = seed(args.organisations)
+        if args.db_latency:
+            install_latency(args.db_latency / 1000)
+
+        results = {}
+        for name, runner in [
+            ('sync', lambda: run_sync(urls, token, args.requests, args.concurrency)),
+            ('async', lambda: asyncio.run(run_async(urls, token, args.requests, args.concurrency))),
+        ]:
+            samples, elapsed = runner()
+            results[name] = {**summarize(samples), 'requests_per_second': round(len(samples) / elapsed, 1)}
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Time from process start to the first response, per WSGI entry point.
+
+    python -m benchmarks.coldstart --runs 10
+
+Starts a fresh interpreter per run, imports the entry point and sends one
+request through it with a token for an unknown user, which is rejected
+after one database query. The database the
+settings point at must be migrated. `--connect-latency` sleeps on every new
+connection to stand in for the handshake with a remote server, which
+mysite.wsgi_serverless overlaps with loading the app.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CHILD_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+latency = float(sys.argv[2]) / 1000
+if latency:
+    from django.db.backends.signals import connection_created
+    connection_created.connect(lambda **kwargs: time.sleep(latency), weak=False)
+import importlib
+application = importlib.import_module(sys.argv[1]).application
+loaded = time.perf_counter()
+import uuid
+from benchmarks.utils import wsgi_call
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+token = AccessToken()
+token[api_settings.USER_ID_CLAIM] = str(uuid.uuid4())
+status, _ = wsgi_call(application, 'GET', f'/api/users/{uuid.uuid4()}', {'Authorization': f'Bearer {token}'})
+assert status == 401, status
+print(loaded - start, time.perf_counter() - start)
+'''
+
+
+def run(entry, latency):
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, entry, str(latency)],
+        env={**os.environ, 'COLD_START_REPORT': '0'}, capture_output=True, text=True, check=True,
+    )
+    return [float(value) for value in result.stdout.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', nargs='+', default=['mysite.wsgi', 'mysite.wsgi_serverless'])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--connect-latency', type=float, default=0, help='milliseconds added to every new connection')
+    args = parser.parse_args()
+
+    results = {}
+    for entry in args.entries:
+        samples = [run(entry, args.connect_latency) for _ in range(args.runs)]
+        results[entry] = {
+            'loaded_ms': round(statistics.median(loaded for loaded, _ in samples) * 1000, 1),
+            'first_response_ms': round(statistics.median(first for _, first in samples) * 1000, 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
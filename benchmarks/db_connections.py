@@ -0,0 +1,91 @@
+"""
+Per-endpoint latency with per-request, persistent and pooled connections.
+
+    python -m benchmarks.db_connections --runs 200 --connect-latency 40
+
+Requests go through the real WSGI handler, so connections are opened and
+closed exactly as in production: `per-request` is the old CONN_MAX_AGE=0
+behaviour, `persistent` the new default, and `pool` (PostgreSQL only) the
+mysite.db_pool backend. `--connect-latency` sleeps on every new connection
+to stand in for the TCP and TLS handshake with the remote server.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.utils import measure, setup, test_database, wsgi_call
+
+
+def call(handler, path, token):
+    status, _ = wsgi_call(handler, 'GET', path, {'Authorization': token})
+    assert status == 200, status
+
+
+def seed():
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from organisations.models import Organisation
+    from users.models import User
+
+    user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+    organisation = Organisation.objects.create(name='Bench Org')
+    organisation.users.add(user)
+    token = f'Bearer {RefreshToken.for_user(user).access_token}'
+    return token, {
+        'user_detail': f'/api/users/{user.pk}',
+        'organisation_list': '/api/organisations',
+        'organisation_detail': f'/api/organisations/{organisation.pk}',
+    }
+
+
+def use_mode(mode):
+    from django.db import connections
+
+    connections['default'].close()
+    settings_dict = connections['default'].settings_dict
+    if mode == 'pool':
+        from mysite.db_pool.base import DatabaseWrapper
+
+        connections['default'] = DatabaseWrapper({**settings_dict, 'CONN_MAX_AGE': 0}, 'default')
+    else:
+        settings_dict['CONN_MAX_AGE'] = 0 if mode == 'per-request' else 300
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--connect-latency', type=float, default=0, help='milliseconds added to every new connection')
+    parser.add_argument('--modes', nargs='+', default=['per-request', 'persistent', 'pool'])
+    args = parser.parse_args()
+
+    setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test.utils import override_settings
+
+    if connection.vendor != 'postgresql' and 'pool' in args.modes:
+        print('Skipping pool mode: it needs PostgreSQL')
+        args.modes.remove('pool')
+
+    def slow_connect(**kwargs):
+        time.sleep(args.connect_latency / 1000)
+
+    with test_database(on_disk=True), override_settings(ALLOWED_HOSTS=['*']):
+        token, endpoints = seed()
+        connection_created.connect(slow_connect, weak=False)
+        handler = WSGIHandler()
+
+        results = {}
+        for mode in args.modes:
+            use_mode(mode)
+            results[mode] = {
+                name: measure(lambda: call(handler, path, token), runs=args.runs)
+                for name, path in endpoints.items()
+            }
+        use_mode('persistent')
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+importdata against Django's loaddata for restoring exportdatajson dumps.
+
+    python -m benchmarks.importdata --users 20000 --organisations 10000 --members 5
+
+Seeds a throwaway test database, exports it, then times each loader
+restoring the dump into emptied tables.
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.utils import setup, test_database
+
+
+def seed(users, organisations, members, batch_size=5000):
+    from organisations.models import Organisation
+    from users.models import User
+
+    user_rows = User.objects.bulk_create(
+        [User(email=f'user{i}@example.com', firstName='User', lastName=str(i), password='!') for i in range(users)],
+        batch_size=batch_size,
+    )
+    org_rows = Organisation.objects.bulk_create(
+        [Organisation(name=f'Organisation {i}') for i in range(organisations)],
+        batch_size=batch_size,
+    )
+    through = Organisation.users.through
+    through.objects.bulk_create(
+        [
+            through(organisation_id=org.pk, user_id=user_rows[(i * members + j) % users].pk)
+            for i, org in enumerate(org_rows)
+            for j in range(min(members, users))
+        ],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+
+
+def empty_tables():
+    from organisations.models import Organisation
+    from users.models import User
+
+    Organisation.objects.all().delete()
+    User.objects.all().delete()
+
+
+def timed(func):
+    empty_tables()
+    start = time.perf_counter()
+    func()
+    return round(time.perf_counter() - start, 3)
+
+
+def run(args):
+    from django.core.management import call_command
+    from django.db import connection
+
+    seed(args.users, args.organisations, args.members)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        call_command('exportdatajson', '--output-dir', tmpdir, stdout=io.StringIO())
+        paths = [os.path.join(tmpdir, 'users.json'), os.path.join(tmpdir, 'organisations.json')]
+
+        results = {
+            'loaddata_s': timed(lambda: call_command('loaddata', *paths, verbosity=0)),
+            'importdata_s': timed(lambda: call_command('importdata', *paths, stdout=io.StringIO())),
+        }
+        if connection.vendor == 'postgresql':
+            results['importdata_copy_s'] = timed(
+                lambda: call_command('importdata', *paths, '--copy', stdout=io.StringIO())
+            )
+    return {'users': args.users, 'organisations': args.organisations, 'members': args.members, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--organisations', type=int, default=2000)
+    parser.add_argument('--members', type=int, default=5, help='Members per organisation')
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        print(json.dumps(run(args), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Latency of the hot lookups with and without the planned indexes.
+
+    python -m benchmarks.indexes --users 20000 --organisations 2000 --members 20
+
+Seeds a throwaway test database with benchmarks.api, times each query from
+`explainqueries` with the indexes in place, then drops the indexes added
+by users 0002 and organisations 0003 and times them again. On SQLite the
+case-insensitive email lookup can't use an index either way.
+"""
+import argparse
+import json
+
+from benchmarks.api import seed
+from benchmarks.utils import measure, setup, test_database
+
+INDEXES = ['users_user_email_upper_idx', 'organisation_name_idx', 'org_users_user_org_idx']
+
+
+def lookups(users, orgs):
+    from organisations.models import Organisation
+    from organisations.serializers import ORGANISATION_FIELDS
+    from users.models import User
+
+    user, org = users[len(users) // 2], orgs[len(orgs) // 2]
+    email = user.email.upper()
+    return {
+        'login_email': lambda: User.objects.get_by_natural_key(email),
+        'organisation_detail': lambda: Organisation.objects.with_membership(user).values(
+            *ORGANISATION_FIELDS, 'is_member'
+        ).get(orgId=org.pk),
+        'organisation_list': lambda: list(user.organisations.values(*ORGANISATION_FIELDS).order_by('name', 'orgId')),
+        'organisations_by_name': lambda: list(Organisation.objects.order_by('name')[:20]),
+    }
+
+
+def drop_indexes():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        for name in INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+        if connection.vendor == 'postgresql':
+            cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--organisations', type=int, default=1000)
+    parser.add_argument('--members', type=int, default=20, help='members per organisation')
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+
+    with test_database(on_disk=True):
+        users, orgs, _ = seed(args.users, args.organisations, args.members)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        results = {}
+        queries = lookups(users, orgs)
+        results['indexed'] = {name: measure(query, runs=args.runs) for name, query in queries.items()}
+        drop_indexes()
+        # Fresh connection, so no statement is reused with its old plan
+        connection.close()
+        results['unindexed'] = {name: measure(query, runs=args.runs) for name, query in queries.items()}
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
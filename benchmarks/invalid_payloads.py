@@ -0,0 +1,71 @@
+"""
+Cost of rejecting requests: a flood of invalid sign-ups, and views that fail
+with an unhandled exception.
+
+    python -m benchmarks.invalid_payloads --runs 2000
+
+Requests go through the WSGI handler against a throwaway test database.
+Each invalid payload is answered with a 422 before any password is hashed,
+with DEBUG off as in production. The server error rows time a view that
+raises, with DEBUG on (Django's technical 500 page) and off (the JSON
+envelope from users.exceptions).
+"""
+import argparse
+import json
+from unittest import mock
+
+from benchmarks.utils import measure, setup, test_database, wsgi_call
+
+INVALID_SIGNUPS = {
+    'empty_body': ({}, 422),
+    'missing_password': ({'firstName': 'A', 'lastName': 'B', 'email': 'a@example.com', 'phone': '1'}, 422),
+    'bad_email': ({'firstName': 'A', 'lastName': 'B', 'email': 'not-an-email', 'password': 'x', 'phone': '1'}, 422),
+    'every_field_invalid': ({'firstName': '', 'lastName': 'x' * 500, 'email': 'x', 'password': '', 'phone': 'x' * 50}, 422),
+    'not_an_object': ([1, 2, 3], 422),
+}
+
+
+def run(runs):
+    setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from users.models import User
+    from users.views import UserDetailView
+
+    results = {}
+    with test_database(), override_settings(ALLOWED_HOSTS=['*'], DEBUG=False):
+        handler = WSGIHandler()
+        for name, (body, expected) in INVALID_SIGNUPS.items():
+            def call(body=body, expected=expected):
+                status, _ = wsgi_call(handler, 'POST', '/auth/register', body=body)
+                assert status == expected, status
+            results[f'register_{name}'] = measure(call, runs=runs)
+
+        user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+        auth = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        path = f'/api/users/{user.pk}'
+
+        def fail():
+            status, _ = wsgi_call(handler, 'GET', path, auth)
+            assert status == 500, status
+
+        # Silences the 'Internal Server Error' log line each failure writes
+        with mock.patch.object(UserDetailView, 'get', side_effect=RuntimeError('boom')), \
+                mock.patch('logging.Logger.error'):
+            for debug in (True, False):
+                with override_settings(DEBUG=debug):
+                    results[f'server_error_debug_{"on" if debug else "off"}'] = measure(fail, runs=max(1, runs // 10))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=2000, help='requests per payload')
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Credential stuffing against POST /auth/login, with and without the token
+bucket throttles from users/throttling.py.
+
+    python -m benchmarks.login_throttle --attackers 3000 --attempts 3
+
+Each attacker has its own address (X-Forwarded-For) and tries `--attempts`
+passwords against emails drawn from a list of `--victims` registered
+accounts. A legitimate user logs in from another address every
+`--legit-every` attack requests. Requests go through the WSGI handler
+against a throwaway test database, using the configured password hasher.
+
+With throttles on, the report counts requests that reached password
+hashing and the CPU time the attack cost. With them off, every request
+hashes a password; that cost is timed on `--unthrottled-sample` requests
+and extrapolated.
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.utils import setup, summarize, test_database, wsgi_call
+
+RATES = {'login_ip': '60/min', 'login_email': '10/min', 'register_ip': '20/min'}
+
+
+def run(attackers, attempts, victims, legit_every, sample):
+    setup()
+    from django.contrib.auth.hashers import make_password
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+
+    from users.metrics import AUTH_THROTTLE_REQUESTS, LOGIN_PASSWORD_HASH_SECONDS
+    from users.models import User
+
+    def hashes():
+        return LOGIN_PASSWORD_HASH_SECONDS.count(outcome='success') + LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure')
+
+    results = {}
+    with test_database(), override_settings(ALLOWED_HOSTS=['*'], DEBUG=False):
+        emails = [f'victim{n}@example.com' for n in range(victims)]
+        password = make_password('correct horse')
+        User.objects.bulk_create([
+            User(email=email, firstName='Victim', lastName='User', password=password) for email in emails
+        ])
+        User.objects.create_user(email='legit@example.com', firstName='Legit', lastName='User', password='letmein')
+        handler = WSGIHandler()
+        rng = random.Random(0)
+        requests = [
+            (f'10.{attacker // 65536 % 256}.{attacker // 256 % 256}.{attacker % 256}', rng.choice(emails))
+            for attacker in range(attackers) for _ in range(attempts)
+        ]
+        rng.shuffle(requests)
+
+        def login(ip, email, password):
+            start = time.perf_counter()
+            code, _ = wsgi_call(handler, 'POST', '/auth/login', {'X-Forwarded-For': ip},
+                                body={'email': email, 'password': password})
+            return code, time.perf_counter() - start
+
+        with override_settings(AUTH_THROTTLE={'ENABLED': True, 'RATES': RATES}):
+            hashed_before = hashes()
+            throttled_before = sum(AUTH_THROTTLE_REQUESTS.value(scope=scope, outcome='throttled') for scope in RATES)
+            statuses, rejected, hashed, legit = {}, [], [], []
+            cpu_start = time.process_time()
+            for n, (ip, email) in enumerate(requests, 1):
+                code, seconds = login(ip, email, 'hunter2')
+                statuses[code] = statuses.get(code, 0) + 1
+                (rejected if code == 429 else hashed).append(seconds)
+                if n % legit_every == 0:
+                    legit.append(login('192.0.2.1', 'legit@example.com', 'letmein')[0])
+            results['throttled'] = {
+                'requests': len(requests),
+                'statuses': statuses,
+                'password_hashes': hashes() - hashed_before - sum(code != 429 for code in legit),
+                'throttle_hits': sum(AUTH_THROTTLE_REQUESTS.value(scope=scope, outcome='throttled') for scope in RATES) - throttled_before,
+                'cpu_seconds': round(time.process_time() - cpu_start, 2),
+                'rejected_latency': summarize(rejected),
+                'hashed_latency': summarize(hashed),
+                'legit_logins_ok': f'{legit.count(200)}/{len(legit)}',
+            }
+
+        with override_settings(AUTH_THROTTLE={'ENABLED': False}):
+            cpu_start = time.process_time()
+            latencies = [login(ip, email, 'hunter2')[1] for ip, email in requests[:sample]]
+            per_request = (time.process_time() - cpu_start) / len(latencies)
+            results['unthrottled'] = {
+                'requests': len(requests),
+                'password_hashes': len(requests),
+                'cpu_seconds_estimate': round(per_request * len(requests), 2),
+                'latency': summarize(latencies),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--attackers', type=int, default=3000)
+    parser.add_argument('--attempts', type=int, default=3, help='login attempts per attacker')
+    parser.add_argument('--victims', type=int, default=20, help='accounts the attackers target')
+    parser.add_argument('--legit-every', type=int, default=1000)
+    parser.add_argument('--unthrottled-sample', type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.attackers, args.attempts, args.victims, args.legit_every, args.unthrottled_sample), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Organisation member counts: COUNT over the membership table versus the
+stored `member_count` column.
+
+    python -m benchmarks.member_counts --sizes 10 1000 10000 50000
+
+For each size, one organisation gets that many members. The report times
+counting its members, listing 20 organisations with their counts, and the
+`reconcilemembercounts` command over every organisation.
+"""
+import argparse
+import io
+import json
+
+from benchmarks.membership import seed_members
+from benchmarks.utils import measure, setup, test_database
+
+
+def run(sizes, runs):
+    from django.core.management import call_command
+    from django.db.models import Count
+
+    from organisations.models import Organisation
+
+    results = []
+    organisations = []
+    for size in sizes:
+        organisation = Organisation.objects.create(name=f'Org with {size} members')
+        seed_members(organisation, size)
+        organisations.append(organisation.pk)
+        # bulk_create skips m2m_changed, as a raw import would
+        call_command('reconcilemembercounts', stdout=io.StringIO())
+
+        def aggregate_count():
+            organisation.users.count()
+
+        def stored_count():
+            Organisation.objects.values_list('member_count', flat=True).get(pk=organisation.pk)
+
+        def annotated_list():
+            list(Organisation.objects.filter(pk__in=organisations).annotate(members=Count('users'))
+                 .values('orgId', 'name', 'members')[:20])
+
+        def stored_list():
+            list(Organisation.objects.filter(pk__in=organisations).values('orgId', 'name', 'member_count')[:20])
+
+        results.append({
+            'members': size,
+            'aggregate_count': measure(aggregate_count, runs=runs),
+            'stored_count': measure(stored_count, runs=runs),
+            'annotated_list': measure(annotated_list, runs=runs),
+            'stored_list': measure(stored_list, runs=runs),
+            'reconcile': measure(lambda: call_command('reconcilemembercounts', stdout=io.StringIO()), runs=5, warmup=1),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        print(json.dumps(run(args.sizes, args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
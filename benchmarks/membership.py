@@ -0,0 +1,79 @@
+"""
+Organisation membership check latency as the member count grows.
+
+    python -m benchmarks.membership --sizes 10 1000 10000 50000
+
+Compares the old `user in organisation.users.all()` check with the EXISTS
+based `Organisation.objects.with_membership()` used by the views.
+"""
+import argparse
+import json
+
+from benchmarks.utils import measure, setup, test_database
+
+
+def seed_members(organisation, count, batch_size=5000):
+    from users.models import User
+
+    users = [
+        User(email=f'member{organisation.pk.hex[:8]}-{i}@example.com',
+             firstName='Member', lastName=str(i), password='!')
+        for i in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    through = organisation.users.through
+    through.objects.bulk_create(
+        [through(organisation_id=organisation.pk, user_id=user.pk) for user in users],
+        batch_size=batch_size,
+    )
+    return users[-1]
+
+
+def run(sizes, runs):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from organisations.models import Organisation
+    from users.views import OrganisationDetailView
+
+    factory = APIRequestFactory()
+    view = OrganisationDetailView.as_view()
+    results = []
+    for size in sizes:
+        organisation = Organisation.objects.create(name=f'Org with {size} members')
+        member = seed_members(organisation, size)
+
+        def legacy_check():
+            org = Organisation.objects.get(orgId=organisation.pk)
+            assert member in org.users.all()
+
+        def exists_check():
+            org = Organisation.objects.with_membership(member).get(orgId=organisation.pk)
+            assert org.is_member
+
+        def detail_view():
+            request = factory.get(f'/api/organisations/{organisation.pk}')
+            force_authenticate(request, user=member)
+            assert view(request, id=organisation.pk).status_code == 200
+
+        results.append({
+            'members': size,
+            'legacy_check': measure(legacy_check, runs=runs),
+            'exists_check': measure(exists_check, runs=runs),
+            'detail_view': measure(detail_view, runs=runs),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        print(json.dumps(run(args.sizes, args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
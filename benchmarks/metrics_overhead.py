@@ -0,0 +1,45 @@
+"""
+Per-request cost of users.middleware.MetricsMiddleware.
+
+    python -m benchmarks.metrics_overhead --runs 500
+
+Times the user detail endpoint with the middleware removed, enabled, and
+enabled with every request's SQL traced.
+"""
+import argparse
+import json
+
+from benchmarks.utils import measure, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=300)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from users.models import User
+
+    without = [name for name in settings.MIDDLEWARE if name != 'users.middleware.MetricsMiddleware']
+    with test_database():
+        user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+        token = f'Bearer {RefreshToken.for_user(user).access_token}'
+        results = {}
+        for name, overrides in [
+            ('disabled', {'MIDDLEWARE': without}),
+            ('enabled', {'REQUEST_METRICS': {'TRACE_SAMPLE_RATE': 0}}),
+            ('traced', {'REQUEST_METRICS': {'TRACE_SAMPLE_RATE': 1}}),
+        ]:
+            with override_settings(**overrides):
+                client = APIClient(HTTP_AUTHORIZATION=token)
+                results[name] = measure(lambda: client.get(f'/api/users/{user.pk}'), runs=args.runs, warmup=20)
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
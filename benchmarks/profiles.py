@@ -0,0 +1,101 @@
+"""
+Import time and per-request overhead of the full and API settings profiles.
+
+    python -m benchmarks.profiles --profiles mysite.settings mysite.settings_api
+
+Each profile runs in fresh processes. Import time covers loading Django
+and the project up to a WSGI application with its URLconf resolved, which
+is the cold start a new serverless instance pays before its first request.
+Per-request latency goes through the WSGI handler against a throwaway test
+database: an authenticated user lookup, and a request rejected for lack of
+a token, which does no database work and so is mostly middleware.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.utils import measure, setup, test_database, wsgi_call
+
+IMPORT_SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(time.perf_counter() - start, len(sys.modules))
+'''
+
+
+def run_python(profile, args):
+    result = subprocess.run(
+        [sys.executable, *args],
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': profile},
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def import_time(profile, runs):
+    samples = []
+    for _ in range(runs):
+        seconds, modules = run_python(profile, ['-c', IMPORT_SCRIPT]).split()
+        samples.append(float(seconds))
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+        'modules': int(modules),
+    }
+
+
+def request_times(runs):
+    # Runs in the profile's own process (see --requests)
+    setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from users.models import User
+
+    with test_database(), override_settings(ALLOWED_HOSTS=['*']):
+        user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+        auth = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        handler = WSGIHandler()
+
+        def call(path, headers, expected):
+            status, _ = wsgi_call(handler, 'GET', path, headers)
+            assert status == expected, status
+
+        return {
+            'user_detail': measure(lambda: call(f'/api/users/{user.pk}', auth, 200), runs=runs),
+            'unauthenticated': measure(lambda: call('/api/organisations', {}, 401), runs=runs),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', nargs='+', default=['mysite.settings', 'mysite.settings_api'],
+                        help='settings modules to compare')
+    parser.add_argument('--imports', type=int, default=10, help='processes started per profile')
+    parser.add_argument('--runs', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('--requests', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.requests:
+        print(json.dumps(request_times(args.runs)))
+        return
+
+    results = {}
+    for profile in args.profiles:
+        results[profile] = {
+            'import': import_time(profile, args.imports),
+            'requests': json.loads(run_python(profile, ['-m', 'benchmarks.profiles', '--requests', '--runs', str(args.runs)])),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
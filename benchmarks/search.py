@@ -0,0 +1,76 @@
+"""
+Latency of organisation search (GET /api/organisations?q=).
+
+    python -m benchmarks.search --organisations 1000000 --memberships 5000
+
+Seeds a throwaway test database with `--organisations` organisations, of
+which the benchmark user belongs to `--memberships`, then times searches
+for a common word, a rare word, a substring and a miss through the WSGI
+handler. The target is a p95 under 20 ms.
+"""
+import argparse
+import json
+import random
+
+from benchmarks.utils import measure, setup, test_database, wsgi_call
+
+WORDS = ['acme', 'globex', 'initech', 'umbrella', 'hooli', 'stark', 'wayne', 'tyrell', 'cyberdyne', 'soylent']
+
+
+def seed(organisations, memberships, batch_size=5000):
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from organisations.models import Organisation
+    from users.models import User
+
+    user = User.objects.create_user(email='bench@example.com', firstName='Bench', lastName='User', password='x')
+    rng = random.Random(0)
+    through = Organisation.users.through
+    for start in range(0, organisations, batch_size):
+        orgs = Organisation.objects.bulk_create([
+            Organisation(
+                name=f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}',
+                description=' '.join(rng.choice(WORDS) for _ in range(8)),
+            )
+            for i in range(start, min(start + batch_size, organisations))
+        ])
+        members = [org for i, org in enumerate(orgs, start) if i * memberships // organisations != (i + 1) * memberships // organisations]
+        through.objects.bulk_create([through(organisation_id=org.pk, user_id=user.pk) for org in members])
+    # One organisation with a word nothing else uses
+    rare = Organisation.objects.create(name='Zanzibar Trading', description='Spices')
+    rare.users.add(user)
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--organisations', type=int, default=100000)
+    parser.add_argument('--memberships', type=int, default=1000, help='organisations the searching user belongs to')
+    parser.add_argument('--runs', type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    with test_database(on_disk=True), override_settings(ALLOWED_HOSTS=['*']):
+        token = seed(args.organisations, args.memberships)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        handler = WSGIHandler()
+
+        def call(q):
+            status, _ = wsgi_call(handler, 'GET', f'/api/organisations?q={q}', {'Authorization': token})
+            assert status == 200, status
+
+        results = {
+            name: measure(lambda: call(q), runs=args.runs)
+            for name, q in [('common_word', 'acme'), ('rare_word', 'zanzibar'), ('substring', 'yberd'), ('no_match', 'qqqq')]
+        }
+        print(json.dumps({'database': connection.vendor, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Organisation list serialization: DRF serializers and JSONRenderer against
+the .values() fast path and users.renderers.
+
+    python -m benchmarks.serializers --organisations 100 1000 10000
+
+Each run fetches a user's organisations and renders the list envelope; the
+two paths are checked to produce identical bytes.
+"""
+import argparse
+import json
+
+from benchmarks.utils import measure, setup, test_database
+
+
+def run(sizes, runs):
+    from rest_framework.renderers import JSONRenderer
+
+    from organisations.models import Organisation
+    from organisations.serializers import ORGANISATION_FIELDS, OrganisationSerializer, organisation_list_data
+    from users.models import User
+    from users.renderers import FastJSONRenderer
+
+    drf_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    results = []
+    for size in sizes:
+        user = User.objects.create_user(email=f'bench{size}@example.com', firstName='Bench', lastName='User', password='x')
+        orgs = Organisation.objects.bulk_create(
+            Organisation(name=f'Organisation {i}', description='Ünïcode description') for i in range(size)
+        )
+        user.organisations.add(*orgs)
+
+        def envelope(organisations):
+            return {'status': 'success', 'message': 'Organisations retrieved successfully',
+                    'data': {'organisations': organisations}}
+
+        def drf():
+            return drf_renderer.render(envelope(OrganisationSerializer(user.organisations.all(), many=True).data))
+
+        def fast():
+            return fast_renderer.render(envelope(organisation_list_data(user.organisations.values(*ORGANISATION_FIELDS))))
+
+        assert drf() == fast()
+        results.append({
+            'organisations': size,
+            'drf': measure(drf, runs=runs),
+            'fast': measure(fast, runs=runs),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--organisations', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    with test_database():
+        print(json.dumps(run(args.organisations, args.runs), indent=2))
+
+
+if __name__ == '__main__':
+    main()
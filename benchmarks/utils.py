@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from wsgiref.util import setup_testing_defaults
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity=0, on_disk=False):
+    # Benchmarks seed their own data, so run them against a throwaway test
+    # database rather than whatever DATABASES['default'] points at.
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if on_disk and connection.vendor == 'sqlite':
+        # SQLite test databases live in memory by default, which is gone
+        # once its connection closes and serialises all threads
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def wsgi_call(handler, method, path, headers=None, body=None):
+    # Drive a WSGI handler directly, so requests open and close database
+    # connections exactly as they do in production (the test client doesn't)
+    data = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path.split('?')[0],
+        'QUERY_STRING': path.partition('?')[2],
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+        **{'HTTP_' + name.upper().replace('-', '_'): value for name, value in (headers or {}).items()},
+    }
+    setup_testing_defaults(environ)
+    statuses = []
+    response = handler(environ, lambda status, response_headers: statuses.append(status))
+    try:
+        content = b''.join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split()[0]), content
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'runs': len(samples),
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+def measure(func, runs=50, warmup=5):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
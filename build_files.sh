@@ -1,2 +1,4 @@
 pip install -r requirements.txt
+# Bytecode built ahead of time, so a cold instance doesn't compile the project
+python3.9 -m compileall -q mysite users organisations
 python3.9 manage.py collecstatic
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Startup helpers for the serverless entry point (mysite/wsgi_serverless.py).
+
+A cold instance has to load Django and the project, compile the URL
+patterns and connect to the database before it can answer. boot() does
+what it can ahead of the first request: the database connection is opened
+in a thread while the app loads, and the URL patterns and serializer
+fields are built eagerly. It also times every import on the way and
+writes a per-package breakdown to stderr, in the spirit of
+`python -X importtime`, so cold-start regressions show up in the logs.
+"""
+import collections
+import contextlib
+import os
+import sys
+import threading
+import time
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+
+# Packages listed in the import report
+REPORT_TOP = 15
+
+
+class ImportTimer:
+    """
+    Record the time spent executing each module imported by the current
+    thread, excluding its own imports, summed per top-level package.
+    """
+
+    active = None
+
+    def __init__(self):
+        self.thread = threading.get_ident()
+        self.self_times = collections.Counter()
+        self.stack = []
+        self.modules = 0
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                timed = TIMED_LOADERS.get(type(spec.loader))
+                if timed is not None:
+                    # A subclass, so isinstance() checks on the loader still hold
+                    spec.loader.__class__ = timed
+                return spec
+        return None
+
+    def __enter__(self):
+        sys.meta_path.insert(0, self)
+        ImportTimer.active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        ImportTimer.active = None
+        sys.meta_path.remove(self)
+
+    def record(self, name, elapsed, children):
+        self.modules += 1
+        self.self_times[name.partition('.')[0]] += elapsed - children
+        if self.stack:
+            self.stack[-1] += elapsed
+
+
+class TimedLoaderMixin:
+    def exec_module(self, module):
+        timer = ImportTimer.active
+        if timer is None or threading.get_ident() != timer.thread:
+            return super().exec_module(module)
+        timer.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return super().exec_module(module)
+        finally:
+            timer.record(module.__name__, time.perf_counter() - start, timer.stack.pop())
+
+
+TIMED_LOADERS = {
+    loader: type(f'Timed{loader.__name__}', (TimedLoaderMixin, loader), {})
+    for loader in (SourceFileLoader, SourcelessFileLoader, ExtensionFileLoader)
+}
+
+
+def import_jwt():
+    """
+    Import PyJWT without cryptography when tokens are signed with HMAC.
+    PyJWT imports cryptography whenever it is installed, which is the
+    single most expensive import of a cold start, but only RSA and EC keys
+    need it.
+    """
+    from django.conf import settings
+
+    if 'jwt' in sys.modules or 'cryptography' in sys.modules:
+        return
+    if not settings.SIMPLE_JWT.get('ALGORITHM', 'HS256').startswith('HS'):
+        import jwt  # noqa: F401
+        return
+    sys.modules['cryptography'] = None
+    try:
+        import jwt  # noqa: F401
+    finally:
+        del sys.modules['cryptography']
+
+
+class DatabaseWarmup(threading.Thread):
+    """
+    Connect the calling thread's database connection from a worker thread,
+    so the network round trips overlap with loading the app.
+    """
+
+    def __init__(self, alias='default'):
+        from django.db import connections
+
+        super().__init__(name=f'warm-{alias}', daemon=True)
+        self.owner = threading.get_ident()
+        self.connection = connections[alias]
+        self.seconds = None
+        self.error = None
+
+    def run(self):
+        start = time.perf_counter()
+        self.connection.inc_thread_sharing()
+        try:
+            self.connection.ensure_connection()
+        except Exception as e:
+            # The first request connects again and reports the error
+            self.error = e
+        finally:
+            self.connection.dec_thread_sharing()
+            self.seconds = time.perf_counter() - start
+
+    def finish(self):
+        self.join()
+        if threading.get_ident() != self.owner:
+            # Requests are served on another thread, which has connections
+            # of its own; don't leave this one open
+            self.connection.inc_thread_sharing()
+            try:
+                self.connection.close()
+            finally:
+                self.connection.dec_thread_sharing()
+
+
+def preload_url_patterns(resolver=None):
+    """Compile every URL pattern's regex, as the first request otherwise would."""
+    from django.urls import URLResolver, get_resolver
+
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            preload_url_patterns(pattern)
+    # Builds the reverse() lookup tables
+    resolver.reverse_dict
+
+
+def preload_serializers():
+    """Build the fields of the serializers that validate request bodies."""
+    from organisations.serializers import OrganisationCreateSerializer
+    from users.serializers import RegistrationSerializer
+
+    for serializer in (RegistrationSerializer, OrganisationCreateSerializer):
+        serializer().fields
+
+
+class ColdStartApplication:
+    """
+    WSGI application that waits for the boot work running in the
+    background before its first request, then reports the cold start.
+    """
+
+    def __init__(self, application, warmups, report):
+        self.application = application
+        self.pending = list(warmups)
+        self.report = report
+        self.lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self.pending:
+            with self.lock:
+                for warmup in self.pending:
+                    warmup.finish()
+                    if self.report is not None:
+                        self.report.append(('database', warmup.seconds, warmup.error))
+                if self.pending and self.report is not None:
+                    write_report(self.report)
+                self.pending = []
+        return self.application(environ, start_response)
+
+
+def write_report(report):
+    lines = ['Cold start:']
+    for phase, seconds, detail in report:
+        if phase == 'imports':
+            lines.append(f'  imports ({detail.modules} modules), self time by package:')
+            for package, package_seconds in detail.self_times.most_common(REPORT_TOP):
+                lines.append(f'    {package_seconds * 1000:8.1f} ms  {package}')
+        elif seconds is not None:
+            note = f' (failed: {detail})' if detail else ''
+            lines.append(f'  {phase}: {seconds * 1000:.1f} ms{note}')
+    sys.stderr.write('\n'.join(lines) + '\n')
+
+
+def boot():
+    """
+    Load the project and return a WSGI application ready for its first
+    request. Set COLD_START_REPORT=0 to skip the import timing and report.
+    """
+    reporting = os.environ.get('COLD_START_REPORT', '1') == '1'
+    report = []
+    timer = ImportTimer() if reporting else contextlib.nullcontext()
+    boot_start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(name):
+        start = time.perf_counter()
+        yield
+        report.append((name, time.perf_counter() - start, None))
+
+    with timer:
+        import django
+        from django.conf import settings
+
+        with phase('settings'):
+            settings.INSTALLED_APPS
+            # Loads the database backend here; only connecting is deferred
+            warmup = DatabaseWarmup()
+        warmup.start()
+        with phase('jwt'):
+            import_jwt()
+        with phase('django'):
+            from django.core.handlers.wsgi import WSGIHandler
+
+            django.setup(set_prefix=False)
+            application = WSGIHandler()
+        with phase('urls'):
+            preload_url_patterns()
+        with phase('serializers'):
+            preload_serializers()
+
+    report.append(('boot', time.perf_counter() - boot_start, None))
+    if reporting:
+        report.append(('imports', None, timer))
+    return ColdStartApplication(application, [warmup], report if reporting else None)
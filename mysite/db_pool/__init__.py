@@ -0,0 +1,111 @@
+"""
+PostgreSQL backend that borrows connections from an in-process pool.
+
+Use it with ENGINE 'mysite.db_pool' and CONN_MAX_AGE 0: Django "closes" the
+connection at the end of each request, which hands it back to the pool, and
+the next request in any thread picks it up without reconnecting. Sizing
+comes from the database's POOL settings (see ConnectionPool).
+"""
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most `max_size` connections made by `connect()`
+    (or the callable passed to acquire()).
+
+    Idle connections are reused most-recently-returned first, so the least
+    used ones age out after `max_idle` seconds. A connection idle for more
+    than `check_after` seconds is passed to `check()` before it is handed
+    out, and dropped if that fails; `reset()` runs when one is returned.
+    """
+
+    def __init__(self, connect=None, max_size=10, timeout=10, max_idle=300, check=None, check_after=5,
+                 reset=None, close=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check = check
+        self.check_after = check_after
+        self.reset = reset
+        self.close = close or (lambda connection: connection.close())
+        self.slots = threading.BoundedSemaphore(max_size)
+        self.idle = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, connect=None):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'No database connection became free within {self.timeout}s')
+        try:
+            while True:
+                with self.lock:
+                    if not self.idle:
+                        break
+                    connection, returned = self.idle.pop()
+                idle_for = time.monotonic() - returned
+                if idle_for > self.max_idle:
+                    self.discard(connection)
+                elif self.check is not None and idle_for > self.check_after and not self.usable(connection):
+                    self.discard(connection)
+                else:
+                    return connection
+            return (connect or self.connect)()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def release(self, connection):
+        try:
+            if self.reset is not None:
+                self.reset(connection)
+        except Exception:
+            self.discard(connection)
+        else:
+            with self.lock:
+                self.idle.append((connection, time.monotonic()))
+        finally:
+            self.slots.release()
+
+    def usable(self, connection):
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
+
+    def discard(self, connection):
+        try:
+            self.close(connection)
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+        for connection, _ in idle:
+            self.discard(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory):
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = factory()
+        return _pools[key]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,67 @@
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from . import ConnectionPool, PoolTimeout, close_pools, get_pool
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'MAX_IDLE': 300,
+    # Seconds a connection may sit idle before it is pinged on checkout
+    'CHECK_AFTER': 5,
+}
+
+
+def check_connection(connection):
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return True
+
+
+def reset_connection(connection):
+    if connection.closed:
+        raise base.Database.InterfaceError('connection already closed')
+    # Anything but idle means a transaction was left open
+    if connection.info.transaction_status != 0:
+        connection.rollback()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Pooled connections to the test database would block the DROP
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+        key = (self.alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+        return get_pool(key, lambda: ConnectionPool(
+            max_size=options['MAX_SIZE'],
+            timeout=options['TIMEOUT'],
+            max_idle=options['MAX_IDLE'],
+            check=check_connection,
+            check_after=options['CHECK_AFTER'],
+            reset=reset_connection,
+        ))
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+        # Set by the parent when it opens a connection; a reused one needs it too
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.release(self.connection)
@@ -14,6 +14,8 @@ from datetime import timedelta
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,7 +27,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-x94^$%%kgu!2-nky^h2@7^6$0n-q5=5d^0m+$z2(^!on=2=08a'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Off unless DJANGO_DEBUG=1: with it on, every unhandled error renders
+# Django's traceback page
+DEBUG = os.environ.get('DJANGO_DEBUG') == '1'
 
 ALLOWED_HOSTS = ['.vercel.app', 'now.sh', '127.0.0.1', 'localhost']
 
@@ -47,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its latency covers the rest of the stack
+    'users.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,14 +89,40 @@ WSGI_APPLICATION = 'mysite.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'railway',
-        'USER': 'postgres',
-        'PASSWORD': 'EIeqxZZcwqvodSupblpzxDrQCDOetuei',
-        'HOST': 'monorail.proxy.rlwy.net',
-        'PORT': '36696',
+        'NAME': os.environ.get('DB_NAME', 'railway'),
+        'USER': os.environ.get('DB_USER', 'postgres'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'EIeqxZZcwqvodSupblpzxDrQCDOetuei'),
+        'HOST': os.environ.get('DB_HOST', 'monorail.proxy.rlwy.net'),
+        'PORT': os.environ.get('DB_PORT', '36696'),
+        # Reuse each process's connection across requests instead of paying
+        # for a new TLS handshake to the remote server every time
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 300)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# 'persistent' (default), 'pgbouncer' when DB_HOST/DB_PORT point at a
+# transaction-pooling pgbouncer, or 'pool' for the in-process pool in
+# mysite/db_pool
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+
+if DB_CONNECTION_MODE == 'pgbouncer':
+    # Named cursors don't survive transaction pooling
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+elif DB_CONNECTION_MODE == 'pool':
+    DATABASES['default'].update({
+        'ENGINE': 'mysite.db_pool',
+        # Connections go back to the pool at the end of every request
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        },
+    })
+elif DB_CONNECTION_MODE != 'persistent':
+    raise ImproperlyConfigured(f'Unknown DB_CONNECTION_MODE {DB_CONNECTION_MODE!r}')
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -118,6 +150,46 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing policy. PASSWORD_HASHER picks the hasher for new and
+# rehashed passwords ('argon2' needs the argon2-cffi package); the others stay
+# listed so existing hashes still verify and are upgraded on the next login.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.TunedScryptPasswordHasher',
+    'argon2': 'users.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
+# Cost parameters per algorithm; omitted values use Django's defaults
+PASSWORD_HASHER_PARAMS = {
+    'pbkdf2_sha256': {
+        key: int(value) for key, value in [('iterations', os.environ.get('PBKDF2_ITERATIONS'))] if value
+    },
+    'scrypt': {
+        key: int(value) for key, value in [
+            ('work_factor', os.environ.get('SCRYPT_WORK_FACTOR')),
+            ('block_size', os.environ.get('SCRYPT_BLOCK_SIZE')),
+            ('parallelism', os.environ.get('SCRYPT_PARALLELISM')),
+        ] if value
+    },
+    'argon2': {
+        key: int(value) for key, value in [
+            ('time_cost', os.environ.get('ARGON2_TIME_COST')),
+            ('memory_cost', os.environ.get('ARGON2_MEMORY_COST')),
+            ('parallelism', os.environ.get('ARGON2_PARALLELISM')),
+        ] if value
+    },
+}
+
+# Logins hashing a password at the same time, per process
+PASSWORD_HASH_CONCURRENCY = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', os.cpu_count() or 1))
+
+AUTHENTICATION_BACKENDS = ['users.backends.EmailBackend']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
 
@@ -156,12 +228,77 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        # Same bytes as rest_framework.renderers.JSONRenderer, via orjson when installed
+        'users.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    # 422 validation envelopes and JSON 500s (see users/exceptions.py)
+    'EXCEPTION_HANDLER': 'users.exceptions.exception_handler',
+    # Proxies in front of the app; throttles then key on the client address
+    # they append to X-Forwarded-For rather than on the whole header
+    'NUM_PROXIES': int(os.environ['NUM_PROXIES']) if os.environ.get('NUM_PROXIES') else None,
 }
 
 SIMPLE_JWT = {
     'USER_ID_FIELD': 'userId',
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=70),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
-}
\ No newline at end of file
+}
+
+
+# In-process cache of authenticated users (see users/authentication.py)
+USER_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('USER_AUTH_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('USER_AUTH_CACHE_TTL', 60)),
+    'CACHE_ALIAS': os.environ.get('USER_AUTH_CACHE_ALIAS') or None,
+    'STATELESS_READS': os.environ.get('USER_AUTH_STATELESS_READS') == '1',
+}
+
+# Token-bucket throttles on login and registration (see users/throttling.py).
+# A rate of '10/min' allows a burst of 10, then one request every 6 seconds.
+AUTH_THROTTLE = {
+    'ENABLED': os.environ.get('AUTH_THROTTLE_ENABLED', '1') == '1',
+    'CACHE_ALIAS': os.environ.get('AUTH_THROTTLE_CACHE_ALIAS') or None,
+    'RATES': {
+        'login_ip': os.environ.get('LOGIN_THROTTLE_IP_RATE', '60/min'),
+        'login_email': os.environ.get('LOGIN_THROTTLE_EMAIL_RATE', '10/min'),
+        'register_ip': os.environ.get('REGISTER_THROTTLE_IP_RATE', '20/min'),
+    },
+}
+
+# Serve the API from the coroutine views in users/async_views.py (run under ASGI)
+ASYNC_API_VIEWS = os.environ.get('ASYNC_API_VIEWS') == '1'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Organisation list/detail responses. Must be shared by every process
+    # serving the API, e.g. django.core.cache.backends.redis.RedisCache with
+    # a redis:// URL as the location; see users/response_cache.py.
+    'responses': {
+        'BACKEND': os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+    },
+}
+
+# Per-user/per-organisation response cache (see users/response_cache.py).
+# Off unless a shared backend is configured: the local-memory default would
+# serve other processes' stale entries, including to removed members
+RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'responses',
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300)),
+    'ENABLED': os.environ.get('RESPONSE_CACHE_ENABLED', '1' if os.environ.get('RESPONSE_CACHE_BACKEND') else '0') == '1',
+}
+
+# Per-endpoint request metrics (see users/middleware.py)
+REQUEST_METRICS = {
+    'SLOW_REQUEST_SECONDS': float(os.environ.get('SLOW_REQUEST_SECONDS', 1.0)),
+    'TRACE_SAMPLE_RATE': float(os.environ.get('SLOW_REQUEST_TRACE_SAMPLE_RATE', 0.1)),
+}
+
+# Bearer token required by the /metrics endpoint; without one it returns 404
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
@@ -0,0 +1,54 @@
+"""
+API profile: the JWT endpoints in users/urls.py and nothing else.
+
+    DJANGO_SETTINGS_MODULE=mysite.settings_api
+
+Drops the admin, sessions, messages and static files apps and their
+middleware, CSRF and clickjacking protection (no view here reads cookies
+or renders HTML) and the browsable API. mysite.settings remains the full
+profile, with the admin at /admin/. Both share the database, so run
+migrations with the full profile.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, REST_FRAMEWORK, TEMPLATES
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+MIDDLEWARE = [
+    # First, so its latency covers the rest of the stack
+    'users.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'mysite.urls_api'
+
+# Nothing here uses sessions; anything that touches one anyway (such as the
+# test client logging out) shouldn't need the sessions table
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'users.renderers.FastJSONRenderer',
+    ],
+}
@@ -30,6 +30,8 @@ urlpatterns = [
     path('', include('users.urls'))
 ]
 
+handler500 = 'users.exceptions.server_error'
+
 
 # urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 # urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
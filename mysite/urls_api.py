@@ -0,0 +1,17 @@
+"""
+URL configuration of the API profile (mysite.settings_api): mysite.urls
+without the admin.
+"""
+from django.urls import path, include
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+)
+
+urlpatterns = [
+    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_reresh'),
+    path('', include('users.urls'))
+]
+
+handler500 = 'users.exceptions.server_error'
@@ -0,0 +1,17 @@
+"""
+WSGI entry point for serverless deployments (see vercel.json).
+
+Same application as mysite/wsgi.py, booted by mysite.coldstart so a cold
+instance connects to the database while the app loads and logs where its
+startup time went.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+
+from mysite.coldstart import boot  # noqa: E402
+
+application = boot()
+
+app = application
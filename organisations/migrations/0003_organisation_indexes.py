@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+from users.operations import AddIndexConcurrentlyIfSupported, add_index, remove_index
+
+# The unique (organisation_id, user_id) index already serves membership
+# checks; this one serves user -> organisations without visiting the rows
+MEMBERSHIP_REVERSE_INDEX = models.Index(fields=['user', 'organisation'], name='org_users_user_org_idx')
+
+
+def membership_table(apps):
+    return apps.get_model('organisations', 'Organisation').users.through
+
+
+def add_membership_index(apps, schema_editor):
+    add_index(membership_table(apps), MEMBERSHIP_REVERSE_INDEX, schema_editor)
+
+
+def remove_membership_index(apps, schema_editor):
+    remove_index(membership_table(apps), MEMBERSHIP_REVERSE_INDEX, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('organisations', '0002_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='organisation',
+            index=models.Index(fields=['name'], name='organisation_name_idx'),
+        ),
+        migrations.RunPython(add_membership_index, remove_membership_index),
+    ]
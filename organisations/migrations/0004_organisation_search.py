@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# PostgreSQL: trigram index matching the UPPER(col::text) LIKE UPPER(...)
+# that icontains compiles to. Built outside the model state because other
+# databases can't create it.
+POSTGRESQL_FORWARDS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS organisation_search_trgm_idx ON organisations_organisation '
+    'USING gin (UPPER("name"::text) gin_trgm_ops, UPPER("description") gin_trgm_ops)',
+]
+POSTGRESQL_BACKWARDS = [
+    'DROP INDEX CONCURRENTLY IF EXISTS organisation_search_trgm_idx',
+]
+
+# SQLite: an FTS5 table with the trigram tokenizer (substring matches, like
+# pg_trgm), kept in step with the organisations table by triggers
+SQLITE_FORWARDS = [
+    'CREATE VIRTUAL TABLE organisations_organisation_fts '
+    'USING fts5("orgId" UNINDEXED, name, description, tokenize="trigram")',
+    'INSERT INTO organisations_organisation_fts ("orgId", name, description) '
+    'SELECT "orgId", name, description FROM organisations_organisation',
+    'CREATE TRIGGER organisations_organisation_fts_insert AFTER INSERT ON organisations_organisation BEGIN '
+    'INSERT INTO organisations_organisation_fts ("orgId", name, description) '
+    'VALUES (new."orgId", new.name, new.description); END',
+    'CREATE TRIGGER organisations_organisation_fts_update AFTER UPDATE ON organisations_organisation BEGIN '
+    'UPDATE organisations_organisation_fts SET "orgId" = new."orgId", name = new.name, description = new.description '
+    'WHERE "orgId" = old."orgId"; END',
+    'CREATE TRIGGER organisations_organisation_fts_delete AFTER DELETE ON organisations_organisation BEGIN '
+    'DELETE FROM organisations_organisation_fts WHERE "orgId" = old."orgId"; END',
+]
+SQLITE_BACKWARDS = [
+    'DROP TRIGGER IF EXISTS organisations_organisation_fts_insert',
+    'DROP TRIGGER IF EXISTS organisations_organisation_fts_update',
+    'DROP TRIGGER IF EXISTS organisations_organisation_fts_delete',
+    'DROP TABLE IF EXISTS organisations_organisation_fts',
+]
+
+STATEMENTS = {
+    'postgresql': (POSTGRESQL_FORWARDS, POSTGRESQL_BACKWARDS),
+    'sqlite': (SQLITE_FORWARDS, SQLITE_BACKWARDS),
+}
+
+
+def run(schema_editor, direction):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    if statements:
+        for sql in statements[direction]:
+            schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    run(schema_editor, 0)
+
+
+def drop_search_index(apps, schema_editor):
+    run(schema_editor, 1)
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('organisations', '0003_organisation_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+import importlib
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+search_migration = importlib.import_module('organisations.migrations.0004_organisation_search')
+
+# Adding a NOT NULL column makes SQLite rebuild organisations_organisation,
+# which drops the FTS triggers from 0004. They are recreated afterwards, the
+# update trigger now only for the searched columns: member_count changes
+# with every membership and shouldn't rewrite the FTS row.
+SQLITE_TRIGGERS = [
+    'CREATE TRIGGER organisations_organisation_fts_insert AFTER INSERT ON organisations_organisation BEGIN '
+    'INSERT INTO organisations_organisation_fts ("orgId", name, description) '
+    'VALUES (new."orgId", new.name, new.description); END',
+    'CREATE TRIGGER organisations_organisation_fts_update '
+    'AFTER UPDATE OF "orgId", name, description ON organisations_organisation BEGIN '
+    'UPDATE organisations_organisation_fts SET "orgId" = new."orgId", name = new.name, description = new.description '
+    'WHERE "orgId" = old."orgId"; END',
+    'CREATE TRIGGER organisations_organisation_fts_delete AFTER DELETE ON organisations_organisation BEGIN '
+    'DELETE FROM organisations_organisation_fts WHERE "orgId" = old."orgId"; END',
+]
+SQLITE_DROP_TRIGGERS = search_migration.SQLITE_BACKWARDS[:3]
+# The 0004 triggers, after the reverse migration rebuilds the table again
+SQLITE_0004_TRIGGERS = [sql for sql in search_migration.SQLITE_FORWARDS if sql.startswith('CREATE TRIGGER')]
+
+
+def run_sqlite(schema_editor, statements):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in statements:
+            schema_editor.execute(sql)
+
+
+def backfill_member_counts(apps, schema_editor):
+    Organisation = apps.get_model('organisations', 'Organisation')
+    memberships = Organisation.users.through.objects.filter(organisation_id=OuterRef('pk'))
+    Organisation.objects.update(member_count=Coalesce(Subquery(
+        memberships.order_by().values('organisation_id').annotate(count=Count('*')).values('count')
+    ), 0))
+
+
+def create_sqlite_triggers(apps, schema_editor):
+    run_sqlite(schema_editor, SQLITE_DROP_TRIGGERS + SQLITE_TRIGGERS)
+
+
+def drop_sqlite_triggers(apps, schema_editor):
+    run_sqlite(schema_editor, SQLITE_DROP_TRIGGERS)
+
+
+def restore_0004_triggers(apps, schema_editor):
+    run_sqlite(schema_editor, SQLITE_DROP_TRIGGERS + SQLITE_0004_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organisations', '0004_organisation_search'),
+    ]
+
+    operations = [
+        # Only does something when migrating backwards, after RemoveField
+        migrations.RunPython(migrations.RunPython.noop, restore_0004_triggers),
+        migrations.AddField(
+            model_name='organisation',
+            name='member_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # Before the triggers exist, so the backfill doesn't touch the FTS table
+        migrations.RunPython(backfill_member_counts, migrations.RunPython.noop),
+        migrations.RunPython(create_sqlite_triggers, drop_sqlite_triggers),
+    ]
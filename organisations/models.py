@@ -1,15 +1,112 @@
-from django.db import models
+from django.db import connection, models, router, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed
 import uuid
 
 from users.models import User
 
+
+class OrganisationQuerySet(models.QuerySet):
+    def with_membership(self, user):
+        # Annotate `is_member` with an EXISTS probe on the membership table.
+        # The (organisation_id, user_id) unique index answers it without
+        # loading any member rows.
+        memberships = Organisation.users.through.objects.filter(
+            organisation_id=OuterRef('pk'),
+            user_id=user.pk,
+        )
+        return self.annotate(is_member=Exists(memberships))
+
+    def member_count_drift(self):
+        """The organisations whose member_count doesn't match their memberships."""
+        return self.alias(counted_members=counted_members()).exclude(member_count=F('counted_members'))
+
+    def reconcile_member_counts(self):
+        """Correct member_count where it has drifted; return the number corrected."""
+        return self.member_count_drift().update(member_count=counted_members())
+
+
+def batched(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def counted_members():
+    return Coalesce(Subquery(
+        Organisation.users.through.objects.filter(organisation_id=OuterRef('pk'))
+        .order_by().values('organisation_id').annotate(count=Count('*')).values('count')
+    ), 0)
+
+
 class Organisation(models.Model):
     orgId = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     users = models.ManyToManyField(User, related_name='organisations')
+    # Rows in the users through table, kept up to date by the m2m_changed
+    # receivers in users.signals; reconcilemembercounts corrects any drift
+    member_count = models.IntegerField(default=0, editable=False)
+
+    objects = OrganisationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='organisation_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def add_members(self, user_ids, batch_size=1000):
+        # Insert membership rows directly instead of going through
+        # `users.add()`, which re-reads existing rows first. The m2m_changed
+        # signals are still sent so receivers see the same events; as with
+        # `users.add()`, `pk_set` must hold only users who aren't members yet,
+        # or member_count overcounts.
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        through = Organisation.users.through
+        db = router.db_for_write(through, instance=self)
+        signal_kwargs = {
+            'sender': through,
+            'instance': self,
+            'reverse': False,
+            'model': User,
+            'pk_set': user_ids,
+            'using': db,
+        }
+        m2m_changed.send(action='pre_add', **signal_kwargs)
+        through.objects.using(db).bulk_create(
+            [through(organisation_id=self.pk, user_id=user_id) for user_id in user_ids],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        m2m_changed.send(action='post_add', **signal_kwargs)
+
+    def bulk_add_members(self, user_ids):
+        """
+        Add the given user ids and return three sets: the ids that were
+        added, the ids that were already members and the ids that match no
+        user.
+        """
+        user_ids = set(user_ids)
+        found, members = set(), set()
+        batch_size = connection.features.max_query_params or len(user_ids) or 1
+        for batch in batched(list(user_ids), batch_size):
+            found.update(User.objects.filter(userId__in=batch).values_list('userId', flat=True))
 
+        if found:
+            with transaction.atomic():
+                # Lock the organisation so concurrent adds of the same user
+                # queue here; the second then reads the first's membership
+                # instead of counting it again in member_count
+                list(Organisation.objects.select_for_update().filter(pk=self.pk).values_list('pk', flat=True))
+                for batch in batched(list(found), batch_size):
+                    members.update(Organisation.users.through.objects.filter(
+                        organisation_id=self.pk,
+                        user_id__in=batch,
+                    ).values_list('user_id', flat=True))
+                self.add_members(found - members)
+        return found - members, members, user_ids - found
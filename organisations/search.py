@@ -0,0 +1,98 @@
+"""
+Ranked search over the organisations a user belongs to, by name and
+description, name matches first.
+
+PostgreSQL matches with icontains, which the pg_trgm index from migration
+0004 serves, and ranks by word_similarity(). Users in few organisations are
+searched by scanning just those; on SQLite, users in many go through the
+FTS5 trigram table from the same migration, ranked by bm25().
+"""
+import uuid
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+
+from .models import Organisation
+from .serializers import ORGANISATION_FIELDS
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_QUERY_LENGTH = 100
+# Name matches count this many times as much as description matches
+NAME_WEIGHT = 2.0
+# The FTS5 trigram tokenizer can't match anything shorter
+FTS_MIN_LENGTH = 3
+# Checking this many organisations directly beats reading every FTS match
+# of a common word
+SCAN_LIMIT = 5000
+
+
+class InvalidSearch(ValueError):
+    pass
+
+
+def clean_query(q):
+    q = q.strip()
+    if not q:
+        raise InvalidSearch('q must not be empty')
+    if len(q) > MAX_QUERY_LENGTH:
+        raise InvalidSearch(f'q must be at most {MAX_QUERY_LENGTH} characters')
+    return q
+
+
+def word_similarity(q, field):
+    return Func(Value(q), F(field), function='word_similarity', output_field=FloatField())
+
+
+def matching(user, q):
+    return Organisation.objects.filter(users=user.pk).filter(Q(name__icontains=q) | Q(description__icontains=q))
+
+
+def search_memberships(user, q, limit):
+    rank = (
+        Case(When(name__icontains=q, then=Value(NAME_WEIGHT)), default=Value(0.0))
+        + Case(When(description__icontains=q, then=Value(1.0)), default=Value(0.0))
+    )
+    return list(matching(user, q).annotate(rank=rank).order_by('-rank', 'name', 'orgId').values(*ORGANISATION_FIELDS)[:limit])
+
+
+def search_postgresql(user, q, limit):
+    rank = word_similarity(q, 'name') * NAME_WEIGHT + word_similarity(q, 'description')
+    return list(matching(user, q).annotate(rank=rank).order_by('-rank', 'name', 'orgId').values(*ORGANISATION_FIELDS)[:limit])
+
+
+def search_sqlite(user, q, limit, using):
+    # A quoted FTS5 string matches the text as a substring, with no operators
+    match = '"%s"' % q.replace('"', '""')
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT o."orgId", o.name, o.description '
+            'FROM organisations_organisation_fts f '
+            'JOIN organisations_organisation_users m ON m.organisation_id = f."orgId" AND m.user_id = %s '
+            'JOIN organisations_organisation o ON o."orgId" = f."orgId" '
+            'WHERE organisations_organisation_fts MATCH %s '
+            'ORDER BY bm25(organisations_organisation_fts, 0, %s, 1), o.name, o."orgId" '
+            'LIMIT %s',
+            [user.pk.hex, match, NAME_WEIGHT, limit],
+        )
+        return [
+            {'orgId': uuid.UUID(org_id), 'name': name, 'description': description}
+            for org_id, name, description in cursor.fetchall()
+        ]
+
+
+def search_organisations(user, q, limit=DEFAULT_LIMIT):
+    """
+    Return up to `limit` of `user`'s organisations matching `q` as
+    ORGANISATION_FIELDS dicts, best match first.
+    """
+    q = clean_query(q)
+    using = Organisation.objects.db
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        return search_postgresql(user, q, limit)
+    if vendor == 'sqlite' and len(q) >= FTS_MIN_LENGTH:
+        memberships = Organisation.users.through.objects.filter(user_id=user.pk)[:SCAN_LIMIT + 1].count()
+        if memberships > SCAN_LIMIT:
+            return search_sqlite(user, q, limit, using)
+    return search_memberships(user, q, limit)
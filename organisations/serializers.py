@@ -1,10 +1,43 @@
 from rest_framework import serializers
 from organisations.models import Organisation
 
+# Read-only fast path: the columns the serializers below expose, fetched with
+# .values() and turned into the same dicts without DRF's field machinery
+ORGANISATION_FIELDS = ('orgId', 'name', 'description')
+# With the memberCount clients can ask for (?include=memberCount)
+ORGANISATION_COUNT_FIELDS = ORGANISATION_FIELDS + ('member_count',)
+
+
+def organisation_data(values):
+    data = {'orgId': str(values['orgId']), 'name': values['name'], 'description': values['description']}
+    if 'member_count' in values:
+        data['memberCount'] = values['member_count']
+    return data
+
+
+def organisation_fields(query_params):
+    """The columns a response needs: ORGANISATION_COUNT_FIELDS for ?include=memberCount."""
+    if 'memberCount' in query_params.get('include', '').split(','):
+        return ORGANISATION_COUNT_FIELDS
+    return ORGANISATION_FIELDS
+
+
+def organisation_list_data(queryset):
+    return [organisation_data(values) for values in queryset]
+
+
 class OrganisationSerializer(serializers.ModelSerializer):
+    memberCount = serializers.IntegerField(source='member_count', read_only=True)
+
     class Meta:
         model = Organisation
-        fields = ('orgId', 'name', 'description')
+        fields = ('orgId', 'name', 'description', 'memberCount')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only on request: OrganisationSerializer(..., context={'member_count': True})
+        if not self.context.get('member_count'):
+            self.fields.pop('memberCount')
         
         
 class OrganisationDetailSerializer(serializers.ModelSerializer):
@@ -0,0 +1,344 @@
+"""
+ASGI-native counterparts of the views in users/views.py, served instead of
+them when settings.ASYNC_API_VIEWS is on. Reads and writes use Django's async
+ORM; password hashing and the less common request shapes (search, bulk
+uploads, form bodies) run the synchronous DRF view in a worker thread.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, status
+
+from organisations.models import Organisation
+from organisations.serializers import (
+    ORGANISATION_FIELDS, OrganisationCreateSerializer, organisation_data, organisation_fields, organisation_list_data,
+)
+from . import response_cache, views
+from .authentication import CachedJWTAuthentication
+from .renderers import dumps
+from .models import User
+from .pagination import InvalidPageParams, encode_cursor, get_page_params, is_paginated, keyset_queryset
+from .serializers import USER_FIELDS, user_data
+from .streaming import STREAM_CHUNK_SIZE, streaming_json_response
+
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    # Rendered exactly like DRF's Response so clients see the same bytes
+    return HttpResponse(dumps(data), status=status, content_type='application/json', headers=headers)
+
+
+def render_sync_view(view, request, **kwargs):
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def cached_response(request, etag, data):
+    if response_cache.etag_matches(request, etag):
+        return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=response_cache.cache_headers(etag))
+    return json_response(data, headers=response_cache.cache_headers(etag))
+
+
+def lookup(make_key, *args):
+    key = make_key(*args)
+    return key, response_cache.get(key)
+
+
+class AsyncAPIView(View):
+    authentication_required = True
+    # DRF view serving requests this class hands off
+    sync_view = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # JWT only, no session cookies. csrf_exempt() itself would hide the
+        # coroutine function from Django 4.2's handler.
+        view.csrf_exempt = True
+        if cls.sync_view is not None:
+            cls.sync_handler = staticmethod(cls.sync_view.as_view())
+        return view
+
+    def requires_authentication(self, request):
+        return self.authentication_required
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.requires_authentication(request):
+            try:
+                result = await CachedJWTAuthentication().aauthenticate(request)
+            except exceptions.APIException as e:
+                return self.auth_error(e)
+            if result is None:
+                return self.auth_error(exceptions.NotAuthenticated())
+            request.user = result[0]
+        return await super().dispatch(request, *args, **kwargs)
+
+    def auth_error(self, exc):
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return json_response(detail, status=status.HTTP_401_UNAUTHORIZED, headers={
+            'WWW-Authenticate': CachedJWTAuthentication().authenticate_header(None),
+        })
+
+    async def run_sync_view(self, request, **kwargs):
+        if self.requires_authentication(request):
+            # Already authenticated here; DRF's Request picks these up
+            # instead of decoding the token again
+            request._force_auth_user = request.user
+            request._force_auth_token = None
+        return await sync_to_async(render_sync_view)(self.sync_handler, request, **kwargs)
+
+    def json_body(self, request):
+        if request.content_type != 'application/json':
+            return None
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+class AsyncUserRegistrationView(AsyncAPIView):
+    authentication_required = False
+    sync_view = views.UserRegistrationView
+
+    async def post(self, request):
+        # Hashing the password is CPU-bound; keep it off the event loop
+        return await self.run_sync_view(request)
+
+
+class AsyncUserLoginView(AsyncAPIView):
+    authentication_required = False
+    sync_view = views.UserLoginView
+
+    async def post(self, request):
+        return await self.run_sync_view(request)
+
+
+class AsyncUserDetailView(AsyncAPIView):
+    async def get(self, request, id):
+        try:
+            user = await User.objects.only(*USER_FIELDS).aget(userId=id)
+        except User.DoesNotExist:
+            return json_response({
+                'status': 'Not found',
+                'message': 'User not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if user != request.user:
+            return json_response({
+                'status': 'Unauthorized',
+                'message': 'You are not authorized to view this user\'s data'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        return json_response({
+            'status': 'success',
+            'message': 'User retrieved successfully',
+            'data': user_data(user)
+        })
+
+
+class AsyncOrganisationView(AsyncAPIView):
+    sync_view = views.OrganisationView
+
+    async def get(self, request):
+        if 'q' in request.GET:
+            return await self.run_sync_view(request)
+
+        try:
+            limit, cursor = get_page_params(request.GET)
+        except InvalidPageParams as e:
+            return json_response({
+                'status': 'Bad Request',
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        streaming = request.GET.get('stream') in ('1', 'true')
+        fields = organisation_fields(request.GET)
+        key = None
+        if response_cache.is_enabled() and not streaming and fields is ORGANISATION_FIELDS:
+            # Cache backends are synchronous; a shared one would block the loop
+            key, entry = await sync_to_async(lookup)(response_cache.organisation_list_key, request.user.pk, request.GET)
+            if entry is not None:
+                return cached_response(request, *entry)
+
+        organisations = Organisation.objects.filter(users=request.user.pk).values(*fields)
+        if streaming:
+            # An async iterator, which Django streams under ASGI; the sync
+            # view's generator would be read into memory first
+            rows = (
+                organisation_data(organisation)
+                async for organisation in keyset_queryset(organisations, 'orgId', cursor).aiterator(chunk_size=STREAM_CHUNK_SIZE)
+            )
+            return streaming_json_response({
+                'status': 'success',
+                'message': 'Organisations retrieved successfully',
+                'data': {
+                    'organisations': None
+                }
+            }, ('data', 'organisations'), rows)
+
+        data = {}
+        if is_paginated(request.GET):
+            page = [org async for org in keyset_queryset(organisations, 'orgId', cursor)[:limit + 1]]
+            data['nextCursor'] = encode_cursor(page[limit - 1]['orgId']) if len(page) > limit else None
+            organisations = page[:limit]
+        else:
+            organisations = [org async for org in organisations.order_by('name', 'orgId')]
+
+        data = {
+            'status': 'success',
+            'message': 'Organisations retrieved successfully',
+            'data': {'organisations': organisation_list_data(organisations), **data}
+        }
+        if key is not None:
+            return cached_response(request, await sync_to_async(response_cache.store_organisation_list)(key, data), data)
+        return json_response(data)
+
+    async def post(self, request):
+        data = self.json_body(request)
+        if data is None:
+            return await self.run_sync_view(request)
+
+        serializer = OrganisationCreateSerializer(data=data)
+        if not serializer.is_valid():
+            return json_response({
+                'status': 'Bad Request',
+                'message': 'Client error',
+                'statusCode': status.HTTP_400_BAD_REQUEST,
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        organisation = await Organisation.objects.acreate(**serializer.validated_data)
+        await organisation.users.aadd(request.user)
+        return json_response({
+            'status': 'success',
+            'message': 'Organisation created successfully',
+            'data': {
+                'orgId': organisation.orgId,
+                'name': organisation.name,
+                'description': organisation.description,
+            }
+        }, status=status.HTTP_201_CREATED)
+
+
+class AsyncOrganisationDetailView(AsyncAPIView):
+    async def get(self, request, id):
+        fields = organisation_fields(request.GET)
+        key = None
+        if response_cache.is_enabled() and fields is ORGANISATION_FIELDS:
+            key, entry = await sync_to_async(lookup)(response_cache.organisation_detail_key, request.user.pk, id)
+            if entry is not None:
+                return cached_response(request, *entry)
+
+        try:
+            organisation = await Organisation.objects.with_membership(request.user).values(
+                *fields, 'is_member'
+            ).aget(orgId=id)
+        except Organisation.DoesNotExist:
+            return json_response({
+                'status': 'Not Found',
+                'message': 'Organisation not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not organisation['is_member']:
+            return json_response({
+                'status': 'Forbidden',
+                'message': 'You do not have permission to view this organisation'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        data = {
+            'status': 'success',
+            'message': 'Organisation retrieved successfully',
+            'data': organisation_data(organisation)
+        }
+        if key is not None:
+            return cached_response(request, await sync_to_async(response_cache.store)(key, data), data)
+        return json_response(data)
+
+
+class AsyncOrganisationUserAddView(AsyncAPIView):
+    authentication_required = False
+    sync_view = views.OrganisationUserAddView
+
+    def requires_authentication(self, request):
+        # Adding members is open; listing them is for members only
+        return request.method == 'GET'
+
+    async def get(self, request, id):
+        try:
+            limit, cursor = get_page_params(request.GET)
+        except InvalidPageParams as e:
+            return json_response({
+                'status': 'Bad Request',
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            organisation = await Organisation.objects.with_membership(request.user).values('is_member', 'member_count').aget(orgId=id)
+        except Organisation.DoesNotExist:
+            return json_response({
+                'status': 'Not Found',
+                'message': 'Organisation not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not organisation['is_member']:
+            return json_response({
+                'status': 'Forbidden',
+                'message': 'You do not have permission to view this organisation'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        memberships = Organisation.users.through.objects.filter(organisation_id=id)
+        members = memberships.select_related('user').only(*[f'user__{field}' for field in USER_FIELDS])
+        page = [membership async for membership in keyset_queryset(members, 'user_id', cursor)[:limit + 1]]
+        data = {
+            'users': [user_data(membership.user) for membership in page[:limit]],
+            'nextCursor': encode_cursor(page[limit - 1].user_id) if len(page) > limit else None,
+        }
+
+        if request.GET.get('count') in ('1', 'true'):
+            data['count'] = organisation['member_count']
+
+        return json_response({
+            'status': 'success',
+            'message': 'Members retrieved successfully',
+            'data': data
+        })
+
+    async def post(self, request, id):
+        data = self.json_body(request)
+        if data is None or 'userId' not in data or 'userIds' in data:
+            # Bulk adds and uploads stay on the synchronous path
+            return await self.run_sync_view(request, id=id)
+
+        try:
+            organisation = await Organisation.objects.aget(orgId=id)
+        except Organisation.DoesNotExist:
+            return json_response({
+                'status': 'Not found',
+                'message': 'Organisation not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not data['userId']:
+            return json_response({
+                'status': 'Bad Request',
+                'message': 'userId is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = await User.objects.aget(userId=data['userId'])
+            # Locks the organisation row, like the sync view
+            await sync_to_async(organisation.bulk_add_members)([user.pk])
+        except User.DoesNotExist:
+            return json_response({
+                'status': 'Not found',
+                'message': 'User not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return json_response({
+            'status': 'success',
+            'message': 'User added to organisation successfully',
+        })
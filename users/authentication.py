@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+DEFAULTS = {
+    # Users kept in each process's LRU
+    'MAX_SIZE': 10000,
+    # Seconds before a cached user is read from the database again. Signals
+    # only reach the local process and the shared cache, so this also bounds
+    # how long other processes may serve a stale user.
+    'TTL': 60,
+    # Optional django.core.cache alias shared between processes
+    'CACHE_ALIAS': None,
+    # Build the user from the token claims alone for GET/HEAD/OPTIONS
+    'STATELESS_READS': False,
+}
+
+# The password hash is never cached; it stays a deferred field
+CACHED_FIELDS = [
+    field.attname for field in User._meta.concrete_fields if field.attname != 'password'
+]
+
+
+def get_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'USER_AUTH_CACHE', {})}
+
+
+class UserCache:
+    """
+    Bounded, thread-safe LRU of user field values keyed by userId, with a
+    TTL, optionally backed by a shared Django cache.
+    """
+
+    key_prefix = 'users:auth:'
+
+    def __init__(self, max_size, ttl, cache_alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = caches[cache_alias] if cache_alias else None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, values = entry
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    return values
+                del self.entries[key]
+
+        if self.shared is not None:
+            values = self.shared.get(self.key_prefix + key)
+            if values is not None:
+                self._store(key, values, now)
+                return values
+        return None
+
+    def set(self, user_id, values):
+        key = str(user_id)
+        self._store(key, values, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, values, self.ttl)
+
+    def _store(self, key, values, now):
+        with self.lock:
+            self.entries[key] = (now + self.ttl, values)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        key = str(user_id)
+        with self.lock:
+            self.entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self.key_prefix + key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_user_cache = None
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        options = get_cache_settings()
+        _user_cache = UserCache(options['MAX_SIZE'], options['TTL'], options['CACHE_ALIAS'])
+    return _user_cache
+
+
+def reset_user_cache(*, setting, **kwargs):
+    global _user_cache
+    if setting in ('USER_AUTH_CACHE', 'CACHES'):
+        _user_cache = None
+
+
+setting_changed.connect(reset_user_cache)
+
+
+def user_from_values(values, fields=CACHED_FIELDS):
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [values[name] for name in fields])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    simplejwt's JWTAuthentication without the per-request SELECT on
+    users_user: users are served from UserCache, which the signals in
+    users.signals invalidate whenever a User is saved or deleted.
+    """
+
+    def authenticate(self, request):
+        self.stateless = get_cache_settings()['STATELESS_READS'] and request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = super().get_user(validated_token)
+            self.cache_user(validated_token, user)
+        return user
+
+    async def aauthenticate(self, request):
+        # Counterpart of authenticate() for async views: token checks are
+        # pure CPU and cache hits need no query, so only a miss leaves the
+        # event loop
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        self.stateless = get_cache_settings()['STATELESS_READS'] and request.method in SAFE_METHODS
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(JWTAuthentication.get_user)(self, validated_token)
+            self.cache_user(validated_token, user)
+        return user, validated_token
+
+    def get_cached_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if self.stateless:
+            # Only the primary key is loaded; any other field is fetched
+            # lazily if a view reads it. is_active is not re-checked.
+            return user_from_values({'userId': User._meta.pk.to_python(user_id)}, ['userId'])
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation compares against the password hash, which is never cached
+            return None
+
+        values = get_user_cache().get(user_id)
+        if values is None:
+            return None
+
+        user = user_from_values(values)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+    def cache_user(self, validated_token, user):
+        if not api_settings.CHECK_REVOKE_TOKEN:
+            get_user_cache().set(
+                validated_token[api_settings.USER_ID_CLAIM],
+                {name: getattr(user, name) for name in CACHED_FIELDS},
+            )
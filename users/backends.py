@@ -0,0 +1,59 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.signals import setting_changed
+
+from .metrics import LOGIN_HASH_WAIT_SECONDS, LOGIN_PASSWORD_HASH_SECONDS
+
+_hash_slots = None
+_hash_slots_lock = threading.Lock()
+
+
+def get_hash_slots():
+    global _hash_slots
+    if _hash_slots is None:
+        with _hash_slots_lock:
+            if _hash_slots is None:
+                _hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_CONCURRENCY)
+    return _hash_slots
+
+
+def reset_hash_slots(*, setting, **kwargs):
+    global _hash_slots
+    if setting == 'PASSWORD_HASH_CONCURRENCY':
+        _hash_slots = None
+
+
+setting_changed.connect(reset_hash_slots)
+
+
+class EmailBackend(ModelBackend):
+    """
+    ModelBackend with password hashing limited to PASSWORD_HASH_CONCURRENCY
+    concurrent logins per process and timed into login metrics.
+
+    ModelBackend still hashes the password when the email is unknown, so an
+    unknown email costs the same as a wrong password and response times do
+    not reveal which emails are registered.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if password is None:
+            return None
+
+        slots = get_hash_slots()
+        with LOGIN_HASH_WAIT_SECONDS.time():
+            slots.acquire()
+        try:
+            start = time.perf_counter()
+            user = super().authenticate(request, username=username, password=password, **kwargs)
+        finally:
+            slots.release()
+
+        LOGIN_PASSWORD_HASH_SECONDS.observe(
+            time.perf_counter() - start,
+            outcome='success' if user is not None else 'failure',
+        )
+        return user
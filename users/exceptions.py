@@ -0,0 +1,60 @@
+"""
+Error responses for the API views, installed through
+REST_FRAMEWORK['EXCEPTION_HANDLER'] and the URLconfs' handler500.
+
+Views raise UnprocessableEntity with a serializer's errors and the handler
+renders the 422 envelope. Exceptions a view doesn't handle become a JSON
+500 with no details, logged like Django logs them; only with DEBUG on do
+they propagate to Django's technical 500 page.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.log import log_response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import exception_handler as drf_exception_handler, set_rollback
+
+from .renderers import dumps
+
+SERVER_ERROR = {'status': 'error', 'message': 'Internal server error'}
+
+
+class UnprocessableEntity(ValidationError):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def __init__(self, errors):
+        # Serializer errors are ErrorDetails already; ValidationError would
+        # rebuild every one of them
+        self.detail = errors
+
+
+def validation_errors(errors):
+    """Flatten serializer errors into the 422 body's [{'field', 'message'}] list."""
+    return [
+        {'field': field, 'message': message}
+        for field, messages in errors.items()
+        for message in (messages if isinstance(messages, list) else (messages,))
+    ]
+
+
+def exception_handler(exc, context):
+    if isinstance(exc, UnprocessableEntity):
+        set_rollback()
+        return Response({'errors': validation_errors(exc.detail)}, status=exc.status_code)
+
+    response = drf_exception_handler(exc, context)
+    if response is not None or settings.DEBUG:
+        return response
+
+    set_rollback()
+    response = Response(SERVER_ERROR, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    request = context['request']._request
+    # Marks the response as logged, so the handler doesn't log it again
+    log_response('%s: %s', 'Internal Server Error', request.path, response=response, request=request, exception=exc)
+    return response
+
+
+def server_error(request, *args, **kwargs):
+    """handler500 for everything DRF doesn't catch, such as the coroutine views."""
+    return HttpResponse(dumps(SERVER_ERROR), status=status.HTTP_500_INTERNAL_SERVER_ERROR, content_type='application/json')
@@ -0,0 +1,272 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import as_completed
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.serializers.python import Serializer
+from django.utils.encoding import is_protected_type
+
+from .parallel import process_pool
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_filename(name, ndjson=False, compress=False):
+    return name + ('.ndjson' if ndjson else '.json') + ('.gz' if compress else '')
+
+
+def m2m_pk_lists(model, pks):
+    """
+    Return {field name: {object pk: [related pks]}} for every auto-created
+    many-to-many field of `model`, with one query per field for all `pks`.
+    """
+    result = {}
+    for field in model._meta.many_to_many:
+        if not field.serialize or not field.remote_field.through._meta.auto_created:
+            continue
+        through = field.remote_field.through
+        source, target = field.m2m_column_name(), field.m2m_reverse_name()
+        related = {pk: [] for pk in pks}
+        rows = through._base_manager.filter(**{f'{source}__in': pks}).values_list(source, target)
+        for pk, related_pk in rows.iterator():
+            related[pk].append(related_pk if is_protected_type(related_pk) else str(related_pk))
+        result[field.name] = related
+    return result
+
+
+def iter_serialized(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield objects in Django's serialization format ({"model", "pk",
+    "fields"}) while reading `queryset` from a server-side cursor. Related
+    keys are fetched straight from the through tables, once per chunk.
+    """
+    model = queryset.model
+    serializer = Serializer()
+    local_fields = [field.attname for field in model._meta.local_fields if field.serialize]
+
+    def serialize(chunk):
+        m2m = m2m_pk_lists(model, [obj.pk for obj in chunk])
+        for obj, data in zip(chunk, serializer.serialize(chunk, fields=local_fields)):
+            for name, related in m2m.items():
+                data['fields'][name] = related[obj.pk]
+            yield data
+
+    chunk = []
+    for obj in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            yield from serialize(chunk)
+            chunk = []
+    if chunk:
+        yield from serialize(chunk)
+
+
+class ExportWriter:
+    """
+    Write serialized objects one at a time, either as a JSON array that
+    `loaddata` understands or as newline-delimited JSON, optionally gzipped.
+    """
+
+    def __init__(self, path, ndjson=False, compress=False):
+        self.path = path
+        self.ndjson = ndjson
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.file = gzip.open(path, 'wt', encoding='utf-8') if compress else open(path, 'w', encoding='utf-8')
+        self.rows = 0
+        # Size of the file on disk (compressed, if gzipped), set by close()
+        self.bytes = 0
+        if not ndjson:
+            self._write('[')
+
+    def _write(self, text):
+        self.file.write(text)
+
+    def write(self, obj):
+        line = json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False)
+        if self.ndjson:
+            self._write(line + '\n')
+        else:
+            self._write(('\n' if self.rows == 0 else ',\n') + line)
+        self.rows += 1
+
+    def close(self):
+        if not self.ndjson:
+            self._write('\n]\n')
+        self.file.close()
+        self.bytes = os.path.getsize(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_queryset(queryset, path, ndjson=False, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    start = time.perf_counter()
+    with ExportWriter(path, ndjson=ndjson, compress=compress) as writer:
+        for obj in iter_serialized(queryset, chunk_size=chunk_size):
+            writer.write(obj)
+    return {
+        'path': path,
+        'rows': writer.rows,
+        'bytes': writer.bytes,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def shard_boundaries(queryset, shards):
+    """
+    Split `queryset` into `shards` primary-key ranges of roughly equal size.
+    Returns `shards - 1` boundary keys; shard i covers [boundary i-1, boundary i).
+    """
+    total = queryset.count()
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    boundaries = []
+    for index in range(1, shards):
+        offset = total * index // shards
+        if offset >= total:
+            break
+        boundary = str(pks[offset])
+        if not boundaries or boundaries[-1] != boundary:
+            boundaries.append(boundary)
+    return boundaries
+
+
+def shard_range(queryset, lower, upper):
+    if lower is not None:
+        queryset = queryset.filter(pk__gte=lower)
+    if upper is not None:
+        queryset = queryset.filter(pk__lt=upper)
+    return queryset
+
+
+def export_shard(model_label, lower, upper, path, ndjson=False, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Runs in a worker process, so it takes plain picklable arguments
+    model = apps.get_model(model_label)
+    stats = export_queryset(
+        shard_range(model._default_manager.all(), lower, upper),
+        path,
+        ndjson=ndjson,
+        compress=compress,
+        chunk_size=chunk_size,
+    )
+    stats['sha256'] = file_sha256(path)
+    return stats
+
+
+class ShardedExport:
+    """
+    Export each table as primary-key range shards, concurrently, recording
+    every finished shard in `manifest.json` so an interrupted export can be
+    resumed from where it stopped.
+    """
+
+    manifest_name = 'manifest.json'
+
+    def __init__(self, output_dir, tables, shards, workers=1, ndjson=False, compress=False,
+                 chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        self.output_dir = output_dir
+        self.tables = tables
+        self.shards = shards
+        self.workers = workers
+        self.ndjson = ndjson
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.manifest_path = os.path.join(output_dir, self.manifest_name)
+
+    def new_manifest(self):
+        manifest = {
+            'format': 'ndjson' if self.ndjson else 'json',
+            'gzip': self.compress,
+            'tables': {},
+        }
+        for name, model in self.tables.items():
+            bounds = [None] + shard_boundaries(model._default_manager.all(), self.shards) + [None]
+            manifest['tables'][name] = {
+                'model': model._meta.label,
+                'shards': [
+                    {
+                        'file': export_filename(f'{name}-{index:04d}', self.ndjson, self.compress),
+                        'lower': lower,
+                        'upper': upper,
+                        'complete': False,
+                    }
+                    for index, (lower, upper) in enumerate(zip(bounds, bounds[1:]))
+                ],
+            }
+        return manifest
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path) as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return None
+        if manifest['format'] != ('ndjson' if self.ndjson else 'json') or manifest['gzip'] != self.compress:
+            return None
+        if set(manifest['tables']) != set(self.tables):
+            return None
+        return manifest
+
+    def save_manifest(self, manifest):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def is_done(self, shard):
+        if not shard['complete']:
+            return False
+        path = os.path.join(self.output_dir, shard['file'])
+        return os.path.exists(path) and file_sha256(path) == shard['sha256']
+
+    def run(self, resume=False):
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = (self.load_manifest() if resume else None) or self.new_manifest()
+        self.save_manifest(manifest)
+
+        pending = []
+        for table in manifest['tables'].values():
+            for shard in table['shards']:
+                if self.is_done(shard):
+                    continue
+                shard['complete'] = False
+                pending.append((table['model'], shard))
+
+        def finish(shard, stats):
+            shard.update(rows=stats['rows'], bytes=stats['bytes'], sha256=stats['sha256'], complete=True)
+            self.save_manifest(manifest)
+            if self.progress is not None:
+                self.progress(stats)
+
+        def arguments(model_label, shard):
+            path = os.path.join(self.output_dir, shard['file'])
+            return (model_label, shard['lower'], shard['upper'], path, self.ndjson, self.compress, self.chunk_size)
+
+        if self.workers > 1 and len(pending) > 1:
+            with process_pool(self.workers) as executor:
+                futures = {
+                    executor.submit(export_shard, *arguments(model_label, shard)): shard
+                    for model_label, shard in pending
+                }
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+        else:
+            for model_label, shard in pending:
+                finish(shard, export_shard(*arguments(model_label, shard)))
+
+        return manifest
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+def hasher_param(algorithm, name, default):
+    # Read tuned parameters from settings.PASSWORD_HASHER_PARAMS on every
+    # use, so must_update() notices a changed policy and the next successful
+    # login rehashes the password.
+    def get(self):
+        return getattr(settings, 'PASSWORD_HASHER_PARAMS', {}).get(algorithm, {}).get(name, default)
+
+    return property(get)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = hasher_param('pbkdf2_sha256', 'iterations', PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = hasher_param('scrypt', 'work_factor', ScryptPasswordHasher.work_factor)
+    block_size = hasher_param('scrypt', 'block_size', ScryptPasswordHasher.block_size)
+    parallelism = hasher_param('scrypt', 'parallelism', ScryptPasswordHasher.parallelism)
+
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * n * r * p bytes; OpenSSL's default cap is 32 MiB
+        return 2 * 128 * self.work_factor * self.block_size * self.parallelism
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = hasher_param('argon2', 'time_cost', Argon2PasswordHasher.time_cost)
+    memory_cost = hasher_param('argon2', 'memory_cost', Argon2PasswordHasher.memory_cost)
+    parallelism = hasher_param('argon2', 'parallelism', Argon2PasswordHasher.parallelism)
+
@@ -0,0 +1,157 @@
+import codecs
+import csv
+import os
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from organisations.models import Organisation
+from .models import User
+from .ndjson import iter_ndjson
+from .parallel import process_pool
+from .serializers import DUPLICATE_EMAIL_MESSAGE, RegistrationSerializer
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []
+
+    @property
+    def failed(self):
+        return len({error['row'] for error in self.errors})
+
+    def add_error(self, row, message, field=None):
+        error = {'row': row, 'message': str(message)}
+        if field is not None:
+            error['field'] = field
+        self.errors.append(error)
+
+
+def detect_format(name):
+    return 'csv' if name.lower().removesuffix('.gz').endswith('.csv') else 'ndjson'
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield `(row_no, data)` from a binary CSV (with a header row) or NDJSON
+    stream. Undecodable NDJSON lines are yielded with `data` set to the error.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(codecs.iterdecode(stream, 'utf-8'))
+        for data in reader:
+            yield reader.line_num, {key: value for key, value in data.items() if value not in (None, '')}
+    else:
+        yield from iter_ndjson(stream, strict=False)
+
+
+class UserImporter:
+    """
+    Create users, their default organisations and memberships in chunks.
+
+    Password hashing is the dominant cost, so it is fanned out to a process
+    pool; every chunk is then written with three bulk INSERTs inside its own
+    transaction.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=None):
+        self.chunk_size = chunk_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.progress = progress
+        self.result = ImportResult()
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self._executor = process_pool(self.workers)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def run(self, rows):
+        chunk = []
+        for row_no, data in rows:
+            self.result.rows += 1
+            chunk.append((row_no, data))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.result
+
+    def hash_passwords(self, passwords):
+        if self._executor is None:
+            return [make_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    def validate(self, chunk):
+        valid = {}
+        for row_no, data in chunk:
+            if isinstance(data, Exception):
+                self.result.add_error(row_no, data)
+                continue
+            if not isinstance(data, dict):
+                self.result.add_error(row_no, 'Expected an object')
+                continue
+            serializer = RegistrationSerializer(data=data)
+            if not serializer.is_valid():
+                for field, messages in serializer.errors.items():
+                    for message in messages:
+                        self.result.add_error(row_no, message, field)
+                continue
+            data = serializer.validated_data
+            email = User.objects.normalize_email(data['email'])
+            if email in valid:
+                self.result.add_error(row_no, 'Duplicate email in import', 'email')
+                continue
+            valid[email] = (row_no, data)
+
+        existing = set(User.objects.filter(email__in=list(valid)).values_list('email', flat=True))
+        for email in existing:
+            row_no, _ = valid.pop(email)
+            self.result.add_error(row_no, DUPLICATE_EMAIL_MESSAGE, 'email')
+        return valid
+
+    def import_chunk(self, chunk):
+        valid = self.validate(chunk)
+        if valid:
+            hashes = self.hash_passwords([data['password'] for _, data in valid.values()])
+            users = [
+                User(
+                    email=email,
+                    firstName=data['firstName'],
+                    lastName=data['lastName'],
+                    phone=data['phone'],
+                    password=password,
+                )
+                for (email, (_, data)), password in zip(valid.items(), hashes)
+            ]
+            # The memberships are bulk inserted without m2m_changed, so each
+            # organisation starts with its one member counted
+            organisations = [Organisation(name=f"{user.firstName}'s Organisation", member_count=1) for user in users]
+            through = Organisation.users.through
+            memberships = [
+                through(organisation_id=organisation.pk, user_id=user.pk)
+                for organisation, user in zip(organisations, users)
+            ]
+            try:
+                with transaction.atomic():
+                    User.objects.bulk_create(users)
+                    Organisation.objects.bulk_create(organisations)
+                    through.objects.bulk_create(memberships)
+            except IntegrityError as e:
+                # Most likely an email registered since validate() ran
+                for row_no, _ in valid.values():
+                    self.result.add_error(row_no, f'Chunk rolled back: {e}')
+            else:
+                self.result.created += len(users)
+
+        if self.progress is not None:
+            self.progress(self.result)
@@ -0,0 +1,204 @@
+import gzip
+import io
+import json
+import os
+import time
+
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .ndjson import iter_ndjson
+
+DEFAULT_CHUNK_SIZE = 2000
+READ_SIZE = 1 << 16
+
+
+def iter_json_array(stream):
+    """
+    Yield the items of a top-level JSON array one at a time, reading the
+    text stream in fixed-size blocks instead of loading it whole.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace and the array punctuation between items
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            if buffer[position] == '[':
+                started = True
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                raise ValueError('Expected a JSON array')
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                position = end
+                continue
+
+        if eof:
+            return
+        block = stream.read(READ_SIZE)
+        eof = not block
+        buffer = buffer[position:] + block
+        position = 0
+
+
+def open_export(path):
+    stream = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+def iter_export(path):
+    """
+    Yield serialized objects from an exportdatajson file (JSON array or
+    NDJSON, optionally gzipped) or from every shard listed in a manifest.
+    """
+    if os.path.basename(path) == 'manifest.json':
+        with open(path) as file:
+            manifest = json.load(file)
+        for table in manifest['tables'].values():
+            for shard in table['shards']:
+                yield from iter_export(os.path.join(os.path.dirname(path), shard['file']))
+        return
+
+    with open_export(path) as stream:
+        if '.ndjson' in os.path.basename(path):
+            for _, obj in iter_ndjson(stream):
+                yield obj
+        else:
+            yield from iter_json_array(stream)
+
+
+def copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class BulkLoader:
+    """
+    Load serialized objects with one multi-row INSERT per model per chunk,
+    followed by one INSERT per many-to-many through table, instead of the
+    per-object save() and per-link add() that loaddata does. With
+    `use_copy` on PostgreSQL the rows are streamed with COPY instead.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, chunk_size=DEFAULT_CHUNK_SIZE, use_copy=False,
+                 ignore_conflicts=False, progress=None):
+        self.using = using
+        self.connection = connections[using]
+        self.chunk_size = chunk_size
+        self.use_copy = use_copy
+        self.ignore_conflicts = ignore_conflicts
+        self.progress = progress
+        self.objects = 0
+        self.links = 0
+        self.models = set()
+        if use_copy and self.connection.vendor != 'postgresql':
+            raise ValueError('COPY is only available on PostgreSQL')
+        if use_copy and ignore_conflicts:
+            raise ValueError('COPY cannot ignore conflicting rows')
+
+    def load(self, objects):
+        with transaction.atomic(using=self.using):
+            chunk = []
+            for deserialized in Deserializer(objects, using=self.using):
+                chunk.append(deserialized)
+                if len(chunk) >= self.chunk_size:
+                    self.load_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.load_chunk(chunk)
+            self.reset_sequences()
+
+    def load_chunk(self, chunk):
+        by_model = {}
+        links = {}
+        for deserialized in chunk:
+            obj = deserialized.object
+            by_model.setdefault(type(obj), []).append(obj)
+            for name, related_pks in deserialized.m2m_data.items():
+                field = obj._meta.get_field(name)
+                through = field.remote_field.through
+                source = through._meta.get_field(field.m2m_field_name()).attname
+                target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+                links.setdefault(through, []).extend(
+                    through(**{source: obj.pk, target: related_pk}) for related_pk in related_pks
+                )
+
+        for model, instances in list(by_model.items()) + list(links.items()):
+            self.models.add(model)
+            if self.use_copy:
+                self.copy(model, instances)
+            else:
+                model._base_manager.using(self.using).bulk_create(
+                    instances,
+                    batch_size=self.chunk_size,
+                    # Links are always idempotent; re-running a load never
+                    # duplicates a membership
+                    ignore_conflicts=self.ignore_conflicts or model in links,
+                )
+
+        self.objects += len(chunk)
+        self.links += sum(len(instances) for instances in links.values())
+        if self.progress is not None:
+            self.progress(self)
+
+    def copy(self, model, instances):
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not (field.primary_key and getattr(instances[0], field.attname) is None)
+        ]
+        buffer = io.StringIO()
+        for instance in instances:
+            buffer.write('\t'.join(
+                copy_value(field.get_db_prep_save(getattr(instance, field.attname), self.connection))
+                for field in fields
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        quote = self.connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN', buffer)
+
+    def reset_sequences(self):
+        # As loaddata does: keep integer sequences ahead of the loaded ids
+        statements = self.connection.ops.sequence_reset_sql(no_style(), list(self.models))
+        if statements:
+            with self.connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
+
+
+def load_files(paths, **options):
+    loader = BulkLoader(**options)
+    start = time.perf_counter()
+
+    def objects():
+        for path in paths:
+            yield from iter_export(path)
+
+    loader.load(objects())
+    return loader, time.perf_counter() - start
@@ -0,0 +1,81 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from organisations import search
+from organisations.models import Organisation
+from organisations.serializers import ORGANISATION_FIELDS
+from users.models import User
+from users.serializers import USER_FIELDS
+
+
+def hot_queries(using):
+    """
+    The queries behind the auth and organisation views, as (name, queryset,
+    vendors) where `vendors` lists the databases whose planner is expected
+    to serve the query from an index (None for all of them).
+    """
+    user = User(userId='00000000-0000-0000-0000-000000000000')
+    users = User.objects.using(using)
+    organisations = Organisation.objects.using(using)
+    return [
+        ('user_detail', users.filter(pk=user.pk), None),
+        # SQLite compiles iexact to LIKE, which no expression index serves
+        ('login_email', users.filter(email__iexact='User@Example.com'), ['postgresql']),
+        ('organisation_detail', organisations.with_membership(user).values(*ORGANISATION_FIELDS, 'is_member').filter(
+            orgId='00000000-0000-0000-0000-000000000000'
+        ), None),
+        ('organisation_page', organisations.filter(users=user.pk).values(*ORGANISATION_FIELDS).order_by('orgId')[:21], None),
+        ('organisation_list', organisations.filter(users=user.pk).values(*ORGANISATION_FIELDS).order_by('name', 'orgId'), None),
+        ('organisation_members', Organisation.users.through.objects.using(using).filter(
+            organisation_id='00000000-0000-0000-0000-000000000000'
+        ).select_related('user').only(*[f'user__{field}' for field in USER_FIELDS]).order_by('user_id')[:101], None),
+        # SQLite searches its FTS5 table with raw SQL
+        ('organisation_search', search.matching(user, 'acme').values(*ORGANISATION_FIELDS)[:20], ['postgresql']),
+        ('organisations_by_name', organisations.order_by('name')[:20], None),
+    ]
+
+
+def full_scans(plan, vendor):
+    # Tables the plan reads row by row instead of through an index
+    if vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    if vendor == 'sqlite':
+        return re.findall(r'\bSCAN (\w+)\b(?! USING)', plan)
+    return []
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the views' hot queries and fail if any of them scans a whole table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--verbose', action='store_true', help='Print every query plan')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        failures = []
+        with transaction.atomic(using=options['database']):
+            if connection.vendor == 'postgresql':
+                # On small tables a sequential scan is cheaper and would hide
+                # a missing index
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset, vendors in hot_queries(options['database']):
+                if vendors is not None and connection.vendor not in vendors:
+                    self.stdout.write(f'{name}: skipped on {connection.vendor}')
+                    continue
+                plan = queryset.explain()
+                if options['verbose']:
+                    self.stdout.write(f'{name}:\n{plan}')
+                scans = full_scans(plan, connection.vendor)
+                if scans:
+                    failures.append(f"{name} scans {', '.join(scans)}")
+                    self.stdout.write(self.style.ERROR(f"{name}: full scan of {', '.join(scans)}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{name}: uses an index'))
+
+        if failures:
+            raise CommandError('; '.join(failures))
@@ -1,31 +1,77 @@
 import os
-import json
-from django.core.management.base import BaseCommand
-from django.core.serializers import serialize
+
+from django.core.management.base import BaseCommand, CommandError
 
 from organisations.models import Organisation
+from users.exporters import DEFAULT_CHUNK_SIZE, ShardedExport, export_filename, export_queryset
 from users.models import User
 
+EXPORTS = {
+    'users': User,
+    'organisations': Organisation,
+}
+
 
 class Command(BaseCommand):
     help = 'Export data from models to JSON files'
 
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f"Tables to export: {', '.join(EXPORTS)} (default: all)")
+        parser.add_argument('--output-dir', default='data_exports', help='Directory to write the exports to')
+        parser.add_argument('--ndjson', action='store_true', help='Write one object per line instead of a JSON array')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output files')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per database round trip')
+        parser.add_argument('--shards', type=int, help='Split each table into this many primary-key ranges, one file each, plus a manifest.json')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Processes exporting shards concurrently (default: one per CPU)')
+        parser.add_argument('--resume', action='store_true', help='Skip shards that the manifest records as complete')
+
     def handle(self, *args, **options):
-        try:
-            # Export User data
-            # user_data = serialize('json', User.objects.all())
-            # self.write_to_file('users.json', user_data)
+        unknown = set(options['models']) - set(EXPORTS)
+        if unknown:
+            raise CommandError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+        if options['shards']:
+            return self.export_shards(options)
 
-            # Export Organisations data
-            organisations_data = serialize('json', Organisation.objects.all())
-            self.write_to_file('organisations.json', organisations_data)
+        try:
+            for name in options['models'] or EXPORTS:
+                filename = export_filename(name, ndjson=options['ndjson'], compress=options['gzip'])
+                stats = export_queryset(
+                    EXPORTS[name].objects.all(),
+                    os.path.join(options['output_dir'], filename),
+                    ndjson=options['ndjson'],
+                    compress=options['gzip'],
+                    chunk_size=options['chunk_size'],
+                )
+                self.write_stats(stats)
 
             self.stdout.write(self.style.SUCCESS('Successfully exported data to JSON files'))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Failed to export data: {str(e)}'))
 
-    def write_to_file(self, filename, data):
-        file_path = os.path.join('data_exports', filename)  
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w') as file:
-            file.write(data)
+    def export_shards(self, options):
+        export = ShardedExport(
+            options['output_dir'],
+            {name: EXPORTS[name] for name in options['models'] or EXPORTS},
+            options['shards'],
+            workers=options['workers'],
+            ndjson=options['ndjson'],
+            compress=options['gzip'],
+            chunk_size=options['chunk_size'],
+            progress=self.write_stats,
+        )
+        try:
+            manifest = export.run(resume=options['resume'])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Failed to export data: {str(e)}'))
+            return
+
+        rows = sum(shard['rows'] for table in manifest['tables'].values() for shard in table['shards'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully exported {rows} rows; manifest at {export.manifest_path}'))
+
+    def write_stats(self, stats):
+        seconds = max(stats['seconds'], 1e-9)
+        self.stdout.write(
+            f"{stats['path']}: {stats['rows']} rows, {stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.2f}s "
+            f"({stats['rows'] / seconds:.0f} rows/s, {stats['bytes'] / 1e6 / seconds:.1f} MB/s)"
+        )
@@ -0,0 +1,44 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from organisations.models import Organisation
+from users.loaders import DEFAULT_CHUNK_SIZE, load_files
+
+
+class Command(BaseCommand):
+    help = 'Bulk load exportdatajson dumps (JSON, NDJSON, gzipped or sharded) into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Export files or a sharded export manifest.json, loaded in order (users before organisations)')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database to load into')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Objects inserted per statement')
+        parser.add_argument('--copy', action='store_true', help='Use PostgreSQL COPY instead of INSERT (target tables must not contain the rows)')
+        parser.add_argument('--ignore-conflicts', action='store_true', help='Skip objects whose primary key already exists')
+
+    def handle(self, *args, **options):
+        def progress(loader):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{loader.objects} objects, {loader.links} links loaded')
+
+        try:
+            loader, seconds = load_files(
+                options['paths'],
+                using=options['database'],
+                chunk_size=options['chunk_size'],
+                use_copy=options['copy'],
+                ignore_conflicts=options['ignore_conflicts'],
+                progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {loader.objects} objects and {loader.links} links in {seconds:.2f}s '
+            f'({loader.objects / max(seconds, 1e-9):.0f} objects/s)'
+        ))
+
+        if Organisation.users.through in loader.models:
+            # Memberships are inserted without m2m_changed, and older dumps
+            # have no member_count
+            call_command('reconcilemembercounts', database=options['database'], stdout=self.stdout)
@@ -0,0 +1,56 @@
+import gzip
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import DEFAULT_CHUNK_SIZE, UserImporter, detect_format, iter_rows
+
+
+class Command(BaseCommand):
+    help = 'Import users from a CSV or NDJSON file, creating their default organisations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or NDJSON file, optionally gzipped; "-" reads stdin')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Input format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows written per transaction')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: one per CPU)')
+        parser.add_argument('--errors', help='Write per-row errors to this file as NDJSON instead of stderr')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if path == '-':
+            stream = sys.stdin.buffer
+        else:
+            try:
+                stream = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+            except OSError as e:
+                raise CommandError(f'Failed to open {path}: {e}')
+
+        start = time.perf_counter()
+
+        def progress(result):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'{result.rows} rows read, {result.created} created, {result.failed} failed '
+                f'({result.rows / elapsed:.0f} rows/s)'
+            )
+
+        with stream, UserImporter(options['chunk_size'], options['workers'], progress) as importer:
+            result = importer.run(iter_rows(stream, fmt))
+
+        if result.errors:
+            lines = '\n'.join(json.dumps(error) for error in result.errors) + '\n'
+            if options['errors']:
+                with open(options['errors'], 'w') as file:
+                    file.write(lines)
+            else:
+                self.stderr.write(lines, ending='')
+
+        message = f'Imported {result.created} of {result.rows} users in {time.perf_counter() - start:.1f}s'
+        if result.failed:
+            self.stdout.write(self.style.WARNING(f'{message}; {result.failed} rows failed'))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
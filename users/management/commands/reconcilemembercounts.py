@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from organisations.models import Organisation
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def organisation_batches(queryset, batch_size):
+    """Split `queryset` into querysets over consecutive ranges of `batch_size` orgIds."""
+    page = queryset.order_by('pk').values_list('pk', flat=True)
+    pks = list(page[:batch_size])
+    while pks:
+        yield queryset.filter(pk__gte=pks[0], pk__lte=pks[-1])
+        pks = list(page.filter(pk__gt=pks[-1])[:batch_size])
+
+
+class Command(BaseCommand):
+    help = 'Recount organisation members and correct member_count wherever it has drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Organisations recounted per UPDATE')
+        parser.add_argument('--dry-run', action='store_true', help='Count the drifted organisations without correcting them')
+
+    def handle(self, *args, **options):
+        drifted = 0
+        # Batches commit one by one, so row locks on a live table stay short
+        for batch in organisation_batches(Organisation.objects.using(options['database']), options['batch_size']):
+            if options['dry_run']:
+                drifted += batch.member_count_drift().count()
+            else:
+                drifted += batch.reconcile_member_counts()
+
+        if options['dry_run']:
+            self.stdout.write(f'{drifted} organisations have a drifted member count')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Corrected the member count of {drifted} organisations'))
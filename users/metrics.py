@@ -0,0 +1,160 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def label_key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def format_labels(self, key, extra=()):
+        pairs = list(zip(self.label_names, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join('%s="%s"' % (name, escape(value)) for name, value in pairs) + '}'
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self.label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self.values.get(self.label_key(labels), 0)
+
+    def render(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return self.header() + [f'{self.name}{self.format_labels(key)} {value}' for key, value in items]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}
+
+    def observe(self, value, **labels):
+        key = self.label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                # per-bucket counts (plus +Inf), observation count, sum
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self.series.get(self.label_key(labels))
+        return series[1] if series else 0
+
+    def sum(self, **labels):
+        series = self.series.get(self.label_key(labels))
+        return series[2] if series else 0.0
+
+    def render(self):
+        with self.lock:
+            items = sorted((key, [list(series[0]), series[1], series[2]]) for key, series in self.series.items())
+        lines = self.header()
+        for key, (counts, total, value_sum) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{self.format_labels(key, [("le", le)])} {cumulative}')
+            lines.append(f'{self.name}_count{self.format_labels(key)} {total}')
+            lines.append(f'{self.name}_sum{self.format_labels(key)} {value_sum}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+LOGIN_PASSWORD_HASH_SECONDS = Histogram(
+    'login_password_hash_seconds',
+    'Time spent authenticating a login, dominated by password hashing.',
+    labels=('outcome',),
+)
+LOGIN_HASH_WAIT_SECONDS = Histogram(
+    'login_password_hash_wait_seconds',
+    'Time logins waited for a free password hashing slot.',
+)
+AUTH_THROTTLE_REQUESTS = Counter(
+    'auth_throttle_requests_total',
+    'Login and registration requests checked against a throttle, by scope and outcome (allowed or throttled).',
+    labels=('scope', 'outcome'),
+)
+
+REQUEST_DURATION_SECONDS = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by URL name.',
+    labels=('view', 'method', 'status'),
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Database queries per request by URL name.',
+    labels=('view',),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds',
+    'Time per request spent in database queries by URL name.',
+    labels=('view',),
+)
+RESPONSE_SIZE_BYTES = Histogram(
+    'http_response_size_bytes',
+    'Response body size by URL name (streamed responses excluded).',
+    labels=('view',),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
@@ -0,0 +1,125 @@
+import contextvars
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, REQUEST_DURATION_SECONDS, RESPONSE_SIZE_BYTES
+
+logger = logging.getLogger('users.requests')
+
+DEFAULTS = {
+    # Requests slower than this are logged
+    'SLOW_REQUEST_SECONDS': 1.0,
+    # Share of requests whose SQL is kept for the slow request log
+    'TRACE_SAMPLE_RATE': 0.0,
+    'TRACE_MAX_QUERIES': 20,
+}
+
+# The recorder of the request being served. Context variables follow the
+# request into sync_to_async threads, so queries made by async views are
+# counted too.
+current_recorder = contextvars.ContextVar('current_recorder', default=None)
+
+
+def get_metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+class QueryRecorder:
+    def __init__(self, trace_limit=0):
+        self.queries = 0
+        self.seconds = 0.0
+        self.trace_limit = trace_limit
+        self.trace = []
+
+    def record(self, sql, seconds):
+        self.queries += 1
+        self.seconds += seconds
+        if len(self.trace) < self.trace_limit:
+            self.trace.append((sql, seconds))
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record(sql, time.perf_counter() - start)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, database queries and time, and response size for every
+    request, labelled by the resolved URL name, in users.metrics.REGISTRY.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_metrics_settings()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before the middleware loaded
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.finish(request, response, recorder, start)
+        return response
+
+    async def __acall__(self, request):
+        recorder, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        self.finish(request, response, recorder, start)
+        return response
+
+    def start(self):
+        sampled = random.random() < self.options['TRACE_SAMPLE_RATE']
+        recorder = QueryRecorder(self.options['TRACE_MAX_QUERIES'] if sampled else 0)
+        return recorder, current_recorder.set(recorder), time.perf_counter()
+
+    def finish(self, request, response, recorder, start):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else 'unresolved'
+
+        REQUEST_DURATION_SECONDS.observe(duration, view=view, method=request.method, status=response.status_code)
+        REQUEST_DB_QUERIES.observe(recorder.queries, view=view)
+        REQUEST_DB_SECONDS.observe(recorder.seconds, view=view)
+        if not response.streaming:
+            RESPONSE_SIZE_BYTES.observe(len(response.content), view=view)
+
+        if duration >= self.options['SLOW_REQUEST_SECONDS']:
+            trace = ''.join(f'\n  {seconds * 1000:.1f}ms {sql}' for sql, seconds in recorder.trace)
+            logger.warning(
+                'Slow request %s %s (%s) took %.3fs: %d queries, %.3fs in the database%s',
+                request.method, request.path, view, duration, recorder.queries, recorder.seconds, trace,
+            )
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+from users.operations import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name='user',
+            index=models.Index(Upper('email'), name='users_user_email_upper_idx'),
+        ),
+    ]
@@ -1,9 +1,17 @@
 import uuid
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, firstName, lastName, password=None, phone=None):
+        user = self.build_user(email, firstName, lastName, password, phone)
+        user.save(using=self._db)
+        return user
+
+    def build_user(self, email, firstName, lastName, password=None, phone=None):
+        # An unsaved user with its password already hashed, so callers can
+        # keep the slow hashing out of their transaction
         if not email:
             raise ValueError('Users must have an email address')
 
@@ -16,9 +24,16 @@ class CustomUserManager(BaseUserManager):
         email = self.normalize_email(email)
         user = self.model(email=email, firstName=firstName, lastName=lastName, phone=phone)
         user.set_password(password)  
-        user.save(using=self._db)
         return user
 
+    def get_by_natural_key(self, username):
+        # Logins match the email case-insensitively. Emails are only unique
+        # as typed, so if that finds several users only an exact match counts.
+        try:
+            return self.get(email__iexact=username)
+        except self.model.MultipleObjectsReturned:
+            return self.get(email=username)
+
     def create_superuser(self, email, firstName, lastName, password=None):
         user = self.create_user(email, firstName, lastName, password)
         user.is_admin = True
@@ -44,6 +59,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # Serves the case-insensitive login lookup in get_by_natural_key
+            models.Index(Upper('email'), name='users_user_email_upper_idx'),
+        ]
+
     def has_perm(self, perm, obj=None):
         return self.is_superuser
 
@@ -0,0 +1,28 @@
+import json
+
+
+class NDJSONError(ValueError):
+    def __init__(self, line_no, message):
+        super().__init__(f'line {line_no}: {message}')
+        self.line_no = line_no
+
+
+def iter_ndjson(stream, strict=True):
+    """
+    Yield `(line_no, value)` for every non-blank line of a newline-delimited
+    JSON stream of str or bytes lines. With `strict=False` an undecodable
+    line is yielded as an NDJSONError value instead of raising it.
+    """
+    for line_no, line in enumerate(stream, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            error = NDJSONError(line_no, str(e))
+            if strict:
+                raise error
+            yield line_no, error
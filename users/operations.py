@@ -0,0 +1,46 @@
+"""
+Migration operations that build indexes without locking out writes.
+
+On PostgreSQL they use CREATE/DROP INDEX CONCURRENTLY, which can't run
+inside a transaction, so migrations using them must set `atomic = False`.
+Other databases get a plain CREATE INDEX.
+"""
+from django.db import migrations
+
+
+def is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+class AddIndexConcurrentlyIfSupported(migrations.AddIndex):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            if is_postgresql(schema_editor):
+                schema_editor.add_index(model, self.index, concurrently=True)
+            else:
+                schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            if is_postgresql(schema_editor):
+                schema_editor.remove_index(model, self.index, concurrently=True)
+            else:
+                schema_editor.remove_index(model, self.index)
+
+
+def add_index(model, index, schema_editor):
+    # For tables whose indexes aren't part of the migration state, such as
+    # auto-created many-to-many tables
+    if is_postgresql(schema_editor):
+        schema_editor.add_index(model, index, concurrently=True)
+    else:
+        schema_editor.add_index(model, index)
+
+
+def remove_index(model, index, schema_editor):
+    if is_postgresql(schema_editor):
+        schema_editor.remove_index(model, index, concurrently=True)
+    else:
+        schema_editor.remove_index(model, index)
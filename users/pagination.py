@@ -0,0 +1,65 @@
+import base64
+import binascii
+import uuid
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidPageParams(ValueError):
+    pass
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(value.bytes).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return uuid.UUID(bytes=base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise InvalidPageParams('Invalid cursor')
+
+
+def is_paginated(query_params):
+    return 'limit' in query_params or 'cursor' in query_params
+
+
+def get_page_params(query_params, default_limit=DEFAULT_PAGE_SIZE, max_limit=MAX_PAGE_SIZE):
+    limit = query_params.get('limit')
+    if limit in (None, ''):
+        limit = default_limit
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageParams('limit must be an integer')
+        if limit < 1:
+            raise InvalidPageParams('limit must be a positive integer')
+        limit = min(limit, max_limit)
+
+    cursor = query_params.get('cursor')
+    cursor = decode_cursor(cursor) if cursor else None
+    return limit, cursor
+
+
+def keyset_queryset(queryset, key, cursor=None):
+    queryset = queryset.order_by(key)
+    if cursor is not None:
+        queryset = queryset.filter(**{f'{key}__gt': cursor})
+    return queryset
+
+
+def keyset_page(queryset, key, limit, cursor=None):
+    # Fetch one extra row to learn whether another page follows, so no
+    # COUNT(*) or OFFSET is ever needed.
+    items = list(keyset_queryset(queryset, key, cursor)[:limit + 1])
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        # Model instances or .values() rows
+        next_cursor = encode_cursor(last[key] if isinstance(last, dict) else getattr(last, key))
+    return items, next_cursor
+
@@ -0,0 +1,19 @@
+import django
+from django.db import connections
+
+
+def init_worker():
+    django.setup()
+
+
+def process_pool(workers):
+    # Imported here: multiprocessing is only needed by bulk imports, and web
+    # processes shouldn't pay for it at startup
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Forked workers must not share the parent's database sockets. Closing is
+    # skipped inside a transaction, where it would break the caller; workers
+    # started from there must then stay off the database.
+    if not any(connection.in_atomic_block for connection in connections.all()):
+        connections.close_all()
+    return ProcessPoolExecutor(workers, initializer=init_worker)
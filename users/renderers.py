@@ -0,0 +1,52 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+encoder = JSONEncoder()
+
+
+def dumps(data):
+    """
+    Encode `data` exactly as rest_framework's JSONRenderer does with the
+    default settings (compact, UTF-8, U+2028/U+2029 escaped), using orjson
+    when it is installed. Anything orjson can't encode identically, such as
+    integers beyond 64 bits or non-string keys, goes through the json module.
+    The one difference: orjson writes non-finite floats as null where DRF
+    raises ValueError.
+    """
+    if orjson is not None:
+        try:
+            # Datetimes go through DRF's encoder, which formats UTC as 'Z'
+            content = orjson.dumps(data, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            pass
+        else:
+            return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    content = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    return content.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with dumps(). Requests for indented output,
+    or projects that change DRF's JSON settings, get the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or self.encoder_class is not JSONEncoder
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,136 @@
+"""
+Cache of the organisation list and detail responses, keyed per user and
+per organisation, with ETags so clients can revalidate with If-None-Match.
+
+Keys embed version tokens rather than being deleted: the receivers in
+users.signals replace a user's token when their memberships change and
+an organisation's token when it is edited, once the change commits, which
+retires every cached response (any page, any query string) that depended on it. Detail keys
+embed both tokens; list entries record the tokens of the organisations
+they contain and are dropped on read once any of them has changed, so an
+edit costs one write however many members the organisation has.
+
+A cache hit skips the database, membership check included, so the cache
+must be shared by every process serving the API (Redis or Memcached):
+with a per-process cache, invalidations never reach the other processes.
+settings.py only enables it when RESPONSE_CACHE_BACKEND is set.
+"""
+import hashlib
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .renderers import dumps
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    # Seconds an entry lives; also bounds staleness after writes that skip
+    # signals, such as the bulk importers
+    'TIMEOUT': 300,
+    'ENABLED': True,
+}
+
+
+
+def get_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def get_response_cache():
+    return caches[get_cache_settings()['CACHE_ALIAS']]
+
+
+def is_enabled():
+    return get_cache_settings()['ENABLED']
+
+
+def version_key(kind, pk):
+    return f'responses:version:{kind}:{pk}'
+
+
+def get_versions(*keys):
+    cache = get_response_cache()
+    versions = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        # A fresh token can't match anything cached under an evicted one
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(kind, pks, using=None):
+    # After COMMIT: a request between the change and the commit would read
+    # the new token with the old rows and cache them under it
+    if pks:
+        versions = {version_key(kind, pk): uuid.uuid4().hex for pk in pks}
+        transaction.on_commit(partial(get_response_cache().set_many, versions, None), using=using)
+
+
+def organisation_list_key(user_id, query_params):
+    user_version, = get_versions(version_key('user', user_id))
+    query = hashlib.md5(repr(sorted(query_params.lists())).encode()).hexdigest()
+    return f'responses:organisations:{user_id}:{user_version}:{query}'
+
+
+def organisation_detail_key(user_id, org_id):
+    user_version, org_version = get_versions(version_key('user', user_id), version_key('organisation', org_id))
+    return f'responses:organisation:{org_id}:{org_version}:{user_id}:{user_version}'
+
+
+def make_etag(data):
+    return '"%s"' % hashlib.sha1(dumps(data)).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return etag in [value.strip().removeprefix('W/') for value in header.split(',')]
+
+
+def cache_headers(etag):
+    # Clients may keep the body but must revalidate it with the ETag
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+
+def respond(request, etag, data):
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return Response(data, status=status.HTTP_200_OK, headers=cache_headers(etag))
+
+
+def get(key):
+    """Return the cached `(etag, data)` for `key`, or None."""
+    cache = get_response_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    etag, data, versions = entry
+    if versions and cache.get_many(list(versions)) != versions:
+        return None
+    return etag, data
+
+
+def store(key, data, organisation_ids=()):
+    """
+    Cache `data` under `key`, valid until the version of any of
+    `organisation_ids` changes. Those versions are read after the data,
+    so an edit in between can go unnoticed until the entry expires.
+    """
+    etag = make_etag(data)
+    keys = [version_key('organisation', pk) for pk in organisation_ids]
+    versions = dict(zip(keys, get_versions(*keys))) if keys else {}
+    get_response_cache().set(key, (etag, data, versions), get_cache_settings()['TIMEOUT'])
+    return etag
+
+
+def store_organisation_list(key, data):
+    return store(key, data, [organisation['orgId'] for organisation in data['data']['organisations']])
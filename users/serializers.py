@@ -1,8 +1,13 @@
+import copy
+
 from rest_framework import serializers
 from organisations.serializers import OrganisationSerializer
 from .models import User
 from django.contrib.auth.hashers import make_password
 
+# Same wording as the UniqueValidator DRF would have generated
+DUPLICATE_EMAIL_MESSAGE = 'user with this email already exists.'
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -10,7 +15,29 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ('userId', 'firstName', 'lastName','phone')
         
         
-class RegistrationSerializer(serializers.ModelSerializer):
+USER_FIELDS = UserSerializer.Meta.fields
+
+
+def user_data(user):
+    # UserSerializer(user).data without the field machinery
+    return {'userId': str(user.userId), 'firstName': user.firstName, 'lastName': user.lastName, 'phone': user.phone}
+
+
+class CachedFieldsMixin:
+    """
+    Build a ModelSerializer's fields from the model once per class and give
+    each instance a copy. Introspecting the model otherwise takes most of
+    the time spent validating a request body.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        if '_field_prototypes' not in cls.__dict__:
+            cls._field_prototypes = super().get_fields()
+        return copy.deepcopy(cls._field_prototypes)
+
+
+class RegistrationSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     phone = serializers.CharField(max_length=20, allow_blank=False)  # Require phone number
     password = serializers.CharField(write_only=True)
 
@@ -19,6 +46,9 @@ class RegistrationSerializer(serializers.ModelSerializer):
         fields = ('firstName', 'lastName', 'email', 'password', 'phone')
         extra_kwargs = {
             'password': {'write_only': True},
+            # Duplicates are caught by the unique constraint on INSERT rather
+            # than with a SELECT up front
+            'email': {'validators': []},
         }
 
     def create(self, validated_data):
@@ -30,4 +60,3 @@ class RegistrationSerializer(serializers.ModelSerializer):
             password=validated_data['password']
         )
         return user
-    
\ No newline at end of file
@@ -0,0 +1,93 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from organisations.models import Organisation
+from . import response_cache
+from .authentication import get_user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    # After COMMIT: cleared any earlier, a concurrent request could cache the
+    # still-committed old row again until the TTL runs out
+    transaction.on_commit(partial(get_user_cache().invalidate, instance.pk), using=using)
+
+
+def member_ids(organisation):
+    return list(Organisation.users.through.objects.filter(organisation_id=organisation.pk).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Organisation)
+@receiver(pre_delete, sender=Organisation)
+def invalidate_organisation_responses(sender, instance, using, created=False, **kwargs):
+    # A new organisation has no members yet, so nothing cached mentions it.
+    # Cached lists record the versions of their organisations, so bumping
+    # this one version retires them too without touching every member.
+    if not created:
+        response_cache.bump('organisation', [instance.pk], using)
+
+
+@receiver(m2m_changed, sender=Organisation.users.through)
+def invalidate_membership_responses(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if reverse:
+        # user.organisations.add(...) and friends: only this user's view changes
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            response_cache.bump('user', [instance.pk], using)
+    elif action in ('post_add', 'post_remove'):
+        response_cache.bump('user', pk_set, using)
+    elif action == 'pre_clear':
+        instance._cleared_member_ids = member_ids(instance)
+    elif action == 'post_clear':
+        response_cache.bump('user', instance.__dict__.pop('_cleared_member_ids', []), using)
+
+
+def change_member_counts(organisations, delta):
+    organisations.update(member_count=F('member_count') + delta)
+
+
+@receiver(m2m_changed, sender=Organisation.users.through)
+def update_member_counts(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # Organisation.member_count follows the through table with F()
+    # increments, so concurrent changes don't overwrite each other
+    organisations = Organisation.objects.using(using)
+    memberships = sender.objects.using(using)
+    if action == 'post_add' and pk_set:
+        # Django only passes ids that weren't members yet
+        if reverse:
+            change_member_counts(organisations.filter(pk__in=pk_set), 1)
+        else:
+            change_member_counts(organisations.filter(pk=instance.pk), len(pk_set))
+    elif action == 'pre_remove':
+        # ...but every id asked for on remove, members or not
+        if reverse:
+            instance._member_count_orgs = list(memberships.filter(
+                user_id=instance.pk, organisation_id__in=pk_set,
+            ).values_list('organisation_id', flat=True))
+        else:
+            instance._member_count_removed = memberships.filter(organisation_id=instance.pk, user_id__in=pk_set).count()
+    elif action == 'post_remove':
+        if reverse:
+            change_member_counts(organisations.filter(pk__in=instance.__dict__.pop('_member_count_orgs', [])), -1)
+        else:
+            removed = instance.__dict__.pop('_member_count_removed', 0)
+            if removed:
+                change_member_counts(organisations.filter(pk=instance.pk), -removed)
+    elif action == 'pre_clear' and reverse:
+        instance._member_count_orgs = list(memberships.filter(user_id=instance.pk).values_list('organisation_id', flat=True))
+    elif action == 'post_clear':
+        if reverse:
+            change_member_counts(organisations.filter(pk__in=instance.__dict__.pop('_member_count_orgs', [])), -1)
+        else:
+            organisations.filter(pk=instance.pk).update(member_count=0)
+
+
+@receiver(pre_delete, sender=User)
+def remove_deleted_member(sender, instance, using, **kwargs):
+    # Deleting a user cascades to its memberships without m2m_changed
+    change_member_counts(Organisation.objects.using(using).filter(users=instance.pk), -1)
@@ -0,0 +1,64 @@
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+STREAM_CHUNK_SIZE = 500
+
+
+def split_envelope(envelope, path):
+    # The encoded envelope before and after the list found at `path`
+    placeholder = b'"__rows__"'
+    target = envelope
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = '__rows__'
+    head, tail = dumps(envelope).split(placeholder, 1)
+    return head + b'[', b']' + tail
+
+
+def stream_json_list(envelope, path, rows, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield `envelope` as JSON with the list found at `path` (a tuple of keys)
+    replaced by `rows`, encoding and sending `chunk_size` rows at a time.
+    """
+    head, tail = split_envelope(envelope, path)
+    yield head
+    chunk = []
+    first = True
+    for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= chunk_size:
+            yield (b'' if first else b',') + b','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + b','.join(chunk)
+    yield tail
+
+
+async def astream_json_list(envelope, path, rows, chunk_size=STREAM_CHUNK_SIZE):
+    """Like stream_json_list(), for an async iterable of rows."""
+    head, tail = split_envelope(envelope, path)
+    yield head
+    chunk = []
+    first = True
+    async for row in rows:
+        chunk.append(dumps(row))
+        if len(chunk) >= chunk_size:
+            yield (b'' if first else b',') + b','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield (b'' if first else b',') + b','.join(chunk)
+    yield tail
+
+
+def streaming_json_response(envelope, path, rows, status=200):
+    # Under ASGI, Django only streams async iterators; a sync one is read
+    # into memory first, so async views pass async rows
+    stream = astream_json_list if hasattr(rows, '__aiter__') else stream_json_list
+    return StreamingHttpResponse(
+        stream(envelope, path, rows),
+        status=status,
+        content_type='application/json',
+    )
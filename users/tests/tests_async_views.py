@@ -0,0 +1,131 @@
+import json
+
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import get_user_cache
+from users.models import User
+from users.urls import async_urlpatterns, sync_urlpatterns
+from organisations.models import Organisation
+
+urlpatterns = [
+    path('', include(async_urlpatterns)),
+    path('sync/', include((sync_urlpatterns, 'sync'))),
+]
+
+
+@override_settings(ROOT_URLCONF='users.tests.tests_async_views')
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = User.objects.create_user(
+            firstName='John',
+            lastName='Doe',
+            email='john.doe@example.com',
+            password='securepassword',
+            phone='1234567890'
+        )
+        self.other = User.objects.create_user(
+            firstName='Jane',
+            lastName='Doe',
+            email='jane.doe@example.com',
+            password='securepassword',
+        )
+        self.organisation = Organisation.objects.create(name="John's Organisation")
+        self.organisation.users.add(self.user)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'headers': {'Authorization': f'Bearer {token}'}}
+        self.client = AsyncClient()
+
+    async def test_requires_token(self):
+        response = await self.client.get(reverse('user_detail', args=[self.user.userId]))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        response = await self.client.get(
+            reverse('user_detail', args=[self.user.userId]), headers={'Authorization': 'Bearer nonsense'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_user_detail(self):
+        response = await self.client.get(reverse('user_detail', args=[self.user.userId]), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['firstName'], 'John')
+
+        response = await self.client.get(reverse('user_detail', args=[self.other.userId]), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_organisation_detail(self):
+        response = await self.client.get(reverse('organisation_detail', args=[self.organisation.orgId]), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['name'], "John's Organisation")
+
+        other = await Organisation.objects.acreate(name='Other')
+        response = await self.client.get(reverse('organisation_detail', args=[other.orgId]), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    async def test_organisation_list_streams_async_iterator(self):
+        response = await self.client.get(reverse('organisation_list_create'), {'stream': 'true'}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        payload = json.loads(b''.join([chunk async for chunk in response.streaming_content]))
+        self.assertEqual([org['name'] for org in payload['data']['organisations']], ["John's Organisation"])
+
+    async def test_create_and_add_member(self):
+        response = await self.client.post(
+            reverse('organisation_list_create'), {'name': 'New', 'description': 'Org'},
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        organisation = await Organisation.objects.aget(orgId=response.json()['data']['orgId'])
+
+        response = await self.client.post(
+            reverse('add_user_to_organisation', args=[organisation.orgId]), {'userId': str(self.other.userId)},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(await organisation.users.filter(pk=self.other.pk).aexists())
+        self.assertTrue(await organisation.users.filter(pk=self.user.pk).aexists())
+
+    async def test_bulk_add_runs_sync_view(self):
+        response = await self.client.post(
+            reverse('add_user_to_organisation', args=[self.organisation.orgId]),
+            {'userIds': [str(self.other.userId)]}, content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['added'], 1)
+
+    async def test_register_and_login(self):
+        response = await self.client.post(reverse('register_user'), {
+            'firstName': 'Ann',
+            'lastName': 'Lee',
+            'email': 'ann@example.com',
+            'password': 'securepassword',
+            'phone': '1234567890',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = await self.client.post(reverse('login_user'), {
+            'email': 'ann@example.com',
+            'password': 'securepassword',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('accessToken', response.json()['data'])
+
+    def test_responses_match_sync_views(self):
+        client = APIClient()
+        for name, args, query in [
+            ('user_detail', [self.user.userId], ''),
+            ('organisation_list_create', [], ''),
+            ('organisation_list_create', [], '?limit=1'),
+            ('organisation_list_create', [], '?include=memberCount'),
+            ('organisation_detail', [self.organisation.orgId], ''),
+            ('organisation_detail', [self.organisation.orgId], '?include=memberCount'),
+            ('add_user_to_organisation', [self.organisation.orgId], '?count=true'),
+        ]:
+            expected = client.get(reverse(f'sync:{name}', args=args) + query, **self.auth)
+            response = client.get(reverse(name, args=args) + query, **self.auth)
+            self.assertEqual(response.status_code, expected.status_code)
+            self.assertEqual(response.content, expected.content)
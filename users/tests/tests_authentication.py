@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import get_user_cache
+from users.models import User
+from organisations.models import Organisation
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            firstName='John',
+            lastName='Doe',
+            email='john.doe@example.com',
+            password='securepassword',
+            phone='1234567890'
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.detail_url = reverse('user_detail', args=[self.user.userId])
+
+    def test_cached_user_skips_user_query(self):
+        self.client.get(self.detail_url)
+        # Only the view's own lookup remains
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['firstName'], 'John')
+
+    def test_save_invalidates_cached_user(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_invalidates_after_commit(self):
+        self.client.get(self.detail_url)
+        cached = get_user_cache().get(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.user.is_active = False
+                self.user.save()
+                # A concurrent request still reads the committed, active row
+                get_user_cache().set(self.user.pk, cached)
+            self.assertIsNotNone(get_user_cache().get(self.user.pk))
+        self.assertIsNone(get_user_cache().get(self.user.pk))
+
+    def test_delete_invalidates_cached_user(self):
+        self.client.get(self.detail_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_rejected_when_inactive(self):
+        self.client.get(self.detail_url)
+        cached = get_user_cache().get(self.user.pk)
+        get_user_cache().set(self.user.pk, {**cached, 'is_active': False})
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(USER_AUTH_CACHE={'TTL': 0})
+    def test_expired_entries_are_reloaded(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(2):
+            self.client.get(self.detail_url)
+
+    @override_settings(USER_AUTH_CACHE={'STATELESS_READS': True})
+    def test_stateless_reads_build_user_from_token(self):
+        org = Organisation.objects.create(name="Org 1")
+        org.users.add(self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('organisation_list_create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['data']['organisations']), 1)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
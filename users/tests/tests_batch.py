@@ -0,0 +1,52 @@
+import uuid
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from organisations.models import Organisation
+
+
+class BatchViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(email='john.doe@example.com', firstName='John', lastName='Doe', phone='1')
+        self.other = User.objects.create(email='jane.doe@example.com', firstName='Jane', lastName='Doe')
+        self.organisation = Organisation.objects.create(name='Mine')
+        self.organisation.users.add(self.user)
+        self.foreign = Organisation.objects.create(name='Theirs')
+        self.foreign.users.add(self.other)
+        self.client.force_authenticate(user=self.user)
+
+    def statuses(self, response, id_field):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(result[id_field], result['status']) for result in response.data['data']['results']]
+
+    def test_users_by_query_string(self):
+        missing = str(uuid.uuid4())
+        ids = [str(self.user.userId), str(self.other.userId), missing, 'nope']
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('user_batch'), {'ids': ','.join(ids)})
+        self.assertEqual(self.statuses(response, 'userId'), list(zip(ids, ['found', 'forbidden', 'missing', 'invalid'])))
+        self.assertEqual(response.data['data']['results'][0]['data']['firstName'], 'John')
+        self.assertNotIn('data', response.data['data']['results'][1])
+
+    def test_organisations_by_post_body(self):
+        missing = str(uuid.uuid4())
+        ids = [str(self.foreign.orgId), str(self.organisation.orgId), missing, str(self.organisation.orgId)]
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('organisation_batch'), {'ids': ids}, format='json')
+        self.assertEqual(self.statuses(response, 'orgId'), list(zip(ids[:3], ['forbidden', 'found', 'missing'])))
+        self.assertEqual(response.data['data']['results'][1]['data']['name'], 'Mine')
+
+    def test_rejects_bad_requests(self):
+        url = reverse('user_batch')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(url, {'ids': 'abc'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = [str(uuid.uuid4()) for _ in range(101)]
+        self.assertEqual(self.client.post(url, {'ids': too_many}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(url, {'ids': str(self.user.userId)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,54 @@
+import io
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+from mysite import coldstart
+
+
+class ColdStartTests(SimpleTestCase):
+    def test_import_timer_records_self_time_per_package(self):
+        sys.modules.pop('colorsys', None)
+        with coldstart.ImportTimer() as timer:
+            import colorsys  # noqa: F401
+        self.assertIn('colorsys', timer.self_times)
+        self.assertEqual(timer.modules, 1)
+        self.assertNotIn(timer, sys.meta_path)
+
+    def test_jwt_is_imported_without_cryptography(self):
+        # A fresh interpreter: this one has imported both already
+        script = (
+            'import django; django.setup()\n'
+            'import sys\n'
+            'from mysite.coldstart import import_jwt\n'
+            'import_jwt()\n'
+            'import jwt\n'
+            'assert "cryptography" not in sys.modules\n'
+            'token = jwt.encode({"a": 1}, "secret", algorithm="HS256")\n'
+            'assert jwt.decode(token, "secret", algorithms=["HS256"]) == {"a": 1}\n'
+        )
+        subprocess.run(
+            [sys.executable, '-c', script],
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE, 'PYTHONPATH': ':'.join(sys.path)},
+            check=True,
+        )
+
+    def test_first_request_waits_for_warmups_and_reports(self):
+        warmup = mock.Mock(seconds=0.01, error=None)
+        application = mock.Mock(return_value=[b''])
+        app = coldstart.ColdStartApplication(application, [warmup], [('boot', 0.2, None)])
+
+        with mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            app({}, None)
+            app({}, None)
+        warmup.finish.assert_called_once_with()
+        self.assertEqual(application.call_count, 2)
+        self.assertIn('boot: 200.0 ms', stderr.getvalue())
+        self.assertIn('database: 10.0 ms', stderr.getvalue())
+
+    def test_preload_url_patterns(self):
+        coldstart.preload_url_patterns()
+        coldstart.preload_serializers()
@@ -0,0 +1,55 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+from mysite.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_released_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=2)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIs(pool.acquire(), connection)
+
+    def test_waits_for_free_slot(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+    def test_failed_connect_frees_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError), max_size=1, timeout=0.01)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.acquire()
+
+    def test_failed_reset_discards_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, reset=mock.Mock(side_effect=RuntimeError))
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertIsNot(pool.acquire(), connection)
+
+    def test_idle_connections_expire(self):
+        pool = ConnectionPool(FakeConnection, max_idle=60)
+        connection = pool.acquire()
+        pool.release(connection)
+        with mock.patch('mysite.db_pool.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNot(pool.acquire(), connection)
+        self.assertTrue(connection.closed)
+
+    def test_unusable_connection_replaced(self):
+        pool = ConnectionPool(FakeConnection, check=lambda connection: False, check_after=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        self.assertIsNot(pool.acquire(), connection)
+        self.assertTrue(connection.closed)
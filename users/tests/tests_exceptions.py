@@ -0,0 +1,100 @@
+import json
+from unittest import mock
+
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import get_resolver, reverse
+from rest_framework import status
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.test import APIClient
+
+from users.exceptions import SERVER_ERROR, server_error, validation_errors
+from users.models import User
+from users.serializers import RegistrationSerializer
+from users.views import UserDetailView
+
+
+class ValidationErrorsTests(SimpleTestCase):
+    def test_flattens_every_message_in_field_order(self):
+        errors = {
+            'email': [ErrorDetail('Enter a valid email address.', code='invalid')],
+            'phone': [ErrorDetail('This field is required.', code='required'), ErrorDetail('Too long.', code='max_length')],
+            'non_field_errors': ErrorDetail('Invalid data.', code='invalid'),
+        }
+        self.assertEqual(validation_errors(errors), [
+            {'field': 'email', 'message': 'Enter a valid email address.'},
+            {'field': 'phone', 'message': 'This field is required.'},
+            {'field': 'phone', 'message': 'Too long.'},
+            {'field': 'non_field_errors', 'message': 'Invalid data.'},
+        ])
+
+    def test_serializer_fields_are_built_once_and_copied(self):
+        first, second = RegistrationSerializer().fields, RegistrationSerializer().fields
+        self.assertEqual(list(first), ['firstName', 'lastName', 'email', 'password', 'phone'])
+        self.assertIsNot(first['email'], second['email'])
+        self.assertIs(first['email'].parent.__class__, RegistrationSerializer)
+        self.assertEqual(repr(first['email']), repr(second['email']))
+
+
+@override_settings(AUTH_THROTTLE={'ENABLED': False})
+class ExceptionHandlerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.register_url = reverse('register_user')
+
+    def test_invalid_registration_lists_every_error(self):
+        response = self.client.post(self.register_url, {'email': 'nope', 'phone': 'x' * 21}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(json.loads(response.content), {'errors': [
+            {'field': 'firstName', 'message': 'This field is required.'},
+            {'field': 'lastName', 'message': 'This field is required.'},
+            {'field': 'email', 'message': 'Enter a valid email address.'},
+            {'field': 'password', 'message': 'This field is required.'},
+            {'field': 'phone', 'message': 'Ensure this field has no more than 20 characters.'},
+        ]})
+
+    def test_duplicate_email(self):
+        User.objects.create_user(email='john.doe@example.com', firstName='John', lastName='Doe', password='x')
+        response = self.client.post(self.register_url, {
+            'firstName': 'John', 'lastName': 'Doe', 'email': 'john.doe@example.com', 'password': 'x', 'phone': '1',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(response.data['errors'], [{'field': 'email', 'message': 'user with this email already exists.'}])
+
+    def test_malformed_json_keeps_drf_response(self):
+        response = self.client.post(self.register_url, '{', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('detail', response.data)
+
+    def test_unhandled_error_is_a_json_500(self):
+        user = User.objects.create_user(email='john.doe@example.com', firstName='John', lastName='Doe', password='x')
+        self.client.force_authenticate(user=user)
+        with mock.patch.object(UserDetailView, 'get', side_effect=RuntimeError('secret detail')), \
+                self.assertLogs('django.request', 'ERROR') as logs:
+            response = self.client.get(reverse('user_detail', args=[user.pk]))
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(json.loads(response.content), SERVER_ERROR)
+        self.assertNotIn(b'secret detail', response.content)
+        # Logged once, with the traceback
+        self.assertEqual(len(logs.records), 1)
+        self.assertIsNotNone(logs.records[0].exc_info)
+
+    @override_settings(DEBUG=True)
+    def test_debug_leaves_unhandled_errors_to_django(self):
+        user = User.objects.create_user(email='john.doe@example.com', firstName='John', lastName='Doe', password='x')
+        self.client.force_authenticate(user=user)
+        with mock.patch.object(UserDetailView, 'get', side_effect=RuntimeError('boom')), \
+                self.assertLogs('django.request', 'ERROR'), self.assertRaisesMessage(RuntimeError, 'boom'):
+            self.client.get(reverse('user_detail', args=[user.pk]))
+
+
+class ServerErrorViewTests(SimpleTestCase):
+    def test_handler500(self):
+        # Resolved by name: importing mysite.urls needs the admin, which the
+        # API profile doesn't install
+        for urlconf in {settings.ROOT_URLCONF, 'mysite.urls_api'}:
+            self.assertIs(get_resolver(urlconf).resolve_error_handler(500), server_error)
+        response = server_error(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content), SERVER_ERROR)
@@ -0,0 +1,147 @@
+import gzip
+import io
+import json
+import tempfile
+from unittest import mock
+from pathlib import Path
+
+from django.core import serializers
+from django.core.management import call_command
+from django.test import TestCase
+from users.models import User
+from organisations.models import Organisation
+
+
+class ExportDataJsonTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.users = [
+            User.objects.create_user(f'user{i}@example.com', 'User', str(i), phone=str(i))
+            for i in range(3)
+        ]
+        for i in range(5):
+            Organisation.objects.create(name=f'Org {i}').users.add(*self.users[:i % 3 + 1])
+
+    def export(self, *args):
+        call_command('exportdatajson', *args, '--output-dir', self.tmpdir.name, '--chunk-size', '2', stdout=io.StringIO())
+
+    def test_export_matches_django_serializer(self):
+        self.export()
+        exported = json.loads((Path(self.tmpdir.name) / 'organisations.json').read_text())
+        expected = json.loads(serializers.serialize('json', Organisation.objects.order_by('pk')))
+        for obj in expected:
+            obj['fields']['users'].sort()
+        for obj in exported:
+            obj['fields']['users'].sort()
+        self.assertEqual(exported, expected)
+
+        users = json.loads((Path(self.tmpdir.name) / 'users.json').read_text())
+        self.assertEqual(len(users), 3)
+        self.assertIn('password', users[0]['fields'])
+
+    def test_export_is_loaddata_compatible(self):
+        self.export('organisations')
+        with open(Path(self.tmpdir.name) / 'organisations.json') as file:
+            objects = list(serializers.deserialize('json', file))
+        self.assertEqual(len(objects), 5)
+
+    def test_export_ndjson_gzip(self):
+        self.export('users', '--ndjson', '--gzip')
+        with gzip.open(Path(self.tmpdir.name) / 'users.ndjson.gz', 'rt') as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual({line['pk'] for line in lines}, {str(user.pk) for user in self.users})
+
+    def test_export_queries_do_not_grow_with_rows(self):
+        # one query for the rows and one prefetch per chunk of two of the five rows
+        with self.assertNumQueries(4):
+            self.export('organisations')
+
+
+class ShardedExportTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        for i in range(7):
+            Organisation.objects.create(name=f'Org {i}')
+
+    def export(self, *args):
+        call_command(
+            'exportdatajson', 'organisations', '--output-dir', self.tmpdir.name,
+            '--shards', '3', '--workers', '1', *args, stdout=io.StringIO(),
+        )
+        return json.loads((Path(self.tmpdir.name) / 'manifest.json').read_text())
+
+    def test_shards_cover_every_row_once(self):
+        manifest = self.export()
+        shards = manifest['tables']['organisations']['shards']
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(sum(shard['rows'] for shard in shards), 7)
+
+        pks = []
+        for shard in shards:
+            with open(Path(self.tmpdir.name) / shard['file']) as file:
+                pks.extend(obj['pk'] for obj in json.load(file))
+        self.assertEqual(sorted(pks), sorted(str(pk) for pk in Organisation.objects.values_list('pk', flat=True)))
+
+    def test_manifest_records_file_sizes(self):
+        Organisation.objects.update(name='Société Générale')
+        for args in ([], ['--ndjson', '--gzip']):
+            manifest = self.export(*args)
+            for shard in manifest['tables']['organisations']['shards']:
+                self.assertEqual(shard['bytes'], (Path(self.tmpdir.name) / shard['file']).stat().st_size)
+
+    def test_resume_skips_completed_shards(self):
+        manifest = self.export()
+        first, second = manifest['tables']['organisations']['shards'][:2]
+        (Path(self.tmpdir.name) / second['file']).unlink()
+        first_mtime = (Path(self.tmpdir.name) / first['file']).stat().st_mtime_ns
+
+        manifest = self.export('--resume')
+        self.assertTrue(all(shard['complete'] for shard in manifest['tables']['organisations']['shards']))
+        self.assertTrue((Path(self.tmpdir.name) / second['file']).exists())
+        self.assertEqual((Path(self.tmpdir.name) / first['file']).stat().st_mtime_ns, first_mtime)
+
+
+class ImportDataTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.users = [
+            User.objects.create_user(f'user{i}@example.com', 'User', str(i), phone=str(i))
+            for i in range(3)
+        ]
+        for i in range(4):
+            Organisation.objects.create(name=f'Org {i}', description='Multi\nline\ttext').users.add(*self.users[:i % 3 + 1])
+
+    def snapshot(self):
+        return (
+            sorted(User.objects.values_list('userId', 'email', 'password', 'phone')),
+            sorted(Organisation.objects.values_list('orgId', 'name', 'description')),
+            sorted(Organisation.users.through.objects.values_list('organisation_id', 'user_id')),
+        )
+
+    def round_trip(self, export_args, paths):
+        call_command('exportdatajson', *export_args, '--output-dir', self.tmpdir.name, stdout=io.StringIO())
+        before = self.snapshot()
+        Organisation.objects.all().delete()
+        User.objects.all().delete()
+
+        call_command('importdata', *[str(Path(self.tmpdir.name) / path) for path in paths], '--chunk-size', '2', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_round_trip_json(self):
+        self.round_trip([], ['users.json', 'organisations.json'])
+
+    def test_round_trip_ndjson_gzip(self):
+        self.round_trip(['--ndjson', '--gzip'], ['users.ndjson.gz', 'organisations.ndjson.gz'])
+
+    def test_round_trip_sharded(self):
+        self.round_trip(['--shards', '2', '--workers', '1'], ['manifest.json'])
+
+    def test_iter_json_array_across_reads(self):
+        from users import loaders
+
+        items = [{'model': 'x', 'fields': {'text': 'a , ] [ b' * i}} for i in range(20)]
+        with mock.patch.object(loaders, 'READ_SIZE', 7):
+            self.assertEqual(list(loaders.iter_json_array(io.StringIO(json.dumps(items, indent=2)))), items)
@@ -0,0 +1,42 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.management.commands.explainqueries import full_scans
+from users.models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailLookupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.login_url = reverse('login_user')
+
+    def test_login_ignores_email_case(self):
+        User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'securepassword')
+        response = self.client.post(self.login_url, {'email': 'John.Doe@Example.com', 'password': 'securepassword'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_emails_differing_only_in_case_need_an_exact_match(self):
+        User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'first')
+        second = User.objects.create_user('John.Doe@example.com', 'John', 'Doe', 'second')
+        self.assertEqual(User.objects.get_by_natural_key('John.Doe@example.com'), second)
+        with self.assertRaises(User.DoesNotExist):
+            User.objects.get_by_natural_key('JOHN.DOE@example.com')
+
+
+class ExplainQueriesTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        stdout = io.StringIO()
+        call_command('explainqueries', stdout=stdout)
+        self.assertNotIn('full scan', stdout.getvalue())
+
+    def test_full_scans(self):
+        self.assertEqual(full_scans('SCAN organisations_organisation\nUSE TEMP B-TREE FOR ORDER BY', 'sqlite'), ['organisations_organisation'])
+        self.assertEqual(full_scans('SCAN organisations_organisation USING INDEX organisation_name_idx', 'sqlite'), [])
+        self.assertEqual(full_scans('SEARCH users_user USING INDEX sqlite_autoindex_users_user_1 (userId=?)', 'sqlite'), [])
+        self.assertEqual(full_scans('Seq Scan on users_user  (cost=0.00..1.01 rows=1 width=8)', 'postgresql'), ['users_user'])
+        self.assertEqual(full_scans('Index Scan using users_user_email_upper_idx on users_user', 'postgresql'), [])
@@ -0,0 +1,72 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.metrics import LOGIN_PASSWORD_HASH_SECONDS
+from users.models import User
+
+SCRYPT_FIRST = [
+    'users.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+@override_settings(AUTH_THROTTLE={'ENABLED': False})
+class LoginHashingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.login_url = reverse('login_user')
+        self.credentials = {'email': 'john.doe@example.com', 'password': 'securepassword'}
+
+    def create_user(self):
+        return User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'securepassword')
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_login_rehashes_with_preferred_hasher(self):
+        user = self.create_user()
+        self.assertTrue(user.password.startswith('md5$'))
+
+        with self.settings(PASSWORD_HASHERS=SCRYPT_FIRST, PASSWORD_HASHER_PARAMS={'scrypt': {'work_factor': 2 ** 4}}):
+            response = self.client.post(self.login_url, self.credentials, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('scrypt$16$'))
+            self.assertTrue(user.check_password('securepassword'))
+
+    @override_settings(PASSWORD_HASHERS=SCRYPT_FIRST, PASSWORD_HASHER_PARAMS={'scrypt': {'work_factor': 2 ** 4}})
+    def test_login_rehashes_when_cost_changes(self):
+        user = self.create_user()
+        self.assertTrue(user.password.startswith('scrypt$16$'))
+
+        with self.settings(PASSWORD_HASHER_PARAMS={'scrypt': {'work_factor': 2 ** 5}}):
+            self.client.post(self.login_url, self.credentials, format='json')
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$32$'))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_login_records_hash_time(self):
+        self.create_user()
+        before = (LOGIN_PASSWORD_HASH_SECONDS.count(outcome='success'), LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure'))
+
+        self.client.post(self.login_url, self.credentials, format='json')
+        self.client.post(self.login_url, {'email': 'nobody@example.com', 'password': 'x'}, format='json')
+
+        self.assertEqual(LOGIN_PASSWORD_HASH_SECONDS.count(outcome='success'), before[0] + 1)
+        self.assertEqual(LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure'), before[1] + 1)
+
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'login_password_hash_seconds_count{outcome="success"}', response.content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_hidden_without_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,133 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from organisations.models import Organisation
+from organisations.serializers import OrganisationSerializer
+
+
+def member_count(organisation):
+    return Organisation.objects.values_list('member_count', flat=True).get(pk=organisation.pk)
+
+
+class MemberCountTests(TestCase):
+    def setUp(self):
+        self.org = Organisation.objects.create(name='Org 1')
+        self.users = [
+            User.objects.create(email=f'member{i}@example.com', firstName='Member', lastName=str(i))
+            for i in range(3)
+        ]
+
+    def test_add_and_remove(self):
+        self.org.users.add(*self.users[:2])
+        self.org.users.add(self.users[0])
+        self.assertEqual(member_count(self.org), 2)
+
+        # Removing a non-member changes nothing
+        self.org.users.remove(self.users[0], self.users[2])
+        self.assertEqual(member_count(self.org), 1)
+
+        self.org.users.clear()
+        self.assertEqual(member_count(self.org), 0)
+
+    def test_reverse_add_remove_and_clear(self):
+        other = Organisation.objects.create(name='Org 2')
+        user = self.users[0]
+        user.organisations.add(self.org, other)
+        self.org.users.add(self.users[1])
+        self.assertEqual((member_count(self.org), member_count(other)), (2, 1))
+
+        user.organisations.remove(other)
+        user.organisations.remove(other)
+        self.assertEqual((member_count(self.org), member_count(other)), (2, 0))
+
+        user.organisations.add(other)
+        user.organisations.clear()
+        self.assertEqual((member_count(self.org), member_count(other)), (1, 0))
+
+    def test_deleting_a_user(self):
+        self.org.add_members([user.pk for user in self.users])
+        self.users[1].delete()
+        self.assertEqual(member_count(self.org), 2)
+
+    def test_reconcile_command(self):
+        self.org.add_members([user.pk for user in self.users])
+        empty = Organisation.objects.create(name='Org 2')
+        Organisation.objects.filter(pk=self.org.pk).update(member_count=7)
+        Organisation.objects.filter(pk=empty.pk).update(member_count=-1)
+
+        out = io.StringIO()
+        call_command('reconcilemembercounts', '--dry-run', stdout=out)
+        self.assertIn('2 organisations have a drifted member count', out.getvalue())
+        self.assertEqual(member_count(self.org), 7)
+
+        call_command('reconcilemembercounts', '--batch-size', '1', stdout=out)
+        self.assertIn('Corrected the member count of 2 organisations', out.getvalue())
+        self.assertEqual((member_count(self.org), member_count(empty)), (3, 0))
+
+    def test_serializer_includes_count_on_request(self):
+        self.org.users.add(self.users[0])
+        self.org.refresh_from_db()
+        self.assertNotIn('memberCount', OrganisationSerializer(self.org).data)
+        self.assertEqual(OrganisationSerializer(self.org, context={'member_count': True}).data['memberCount'], 1)
+        self.assertEqual(OrganisationSerializer([self.org], many=True, context={'member_count': True}).data[0]['memberCount'], 1)
+
+
+@override_settings(AUTH_THROTTLE={'ENABLED': False})
+class MemberCountViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(email='john.doe@example.com', firstName='John', lastName='Doe')
+        self.other = User.objects.create(email='jane.doe@example.com', firstName='Jane', lastName='Doe')
+        self.org = Organisation.objects.create(name='Org 1')
+        self.org.users.add(self.user)
+        self.client.force_authenticate(user=self.user)
+
+    def test_registration_counts_the_new_member(self):
+        self.client.post(reverse('register_user'), {
+            'firstName': 'Ann', 'lastName': 'Lee', 'email': 'ann@example.com', 'password': 'x', 'phone': '1',
+        }, format='json')
+        self.assertEqual(Organisation.objects.get(users__email='ann@example.com').member_count, 1)
+
+    def test_add_user_view(self):
+        url = reverse('add_user_to_organisation', args=[self.org.orgId])
+        self.client.post(url, {'userId': str(self.other.userId)}, format='json')
+        self.client.post(url, {'userId': str(self.other.userId)}, format='json')
+        self.assertEqual(member_count(self.org), 2)
+
+    def test_add_user_view_takes_the_bulk_add_lock(self):
+        # users.add() reads missing ids unlocked, so two concurrent adds of
+        # one user would both count them
+        url = reverse('add_user_to_organisation', args=[self.org.orgId])
+        with mock.patch.object(Organisation, 'bulk_add_members', autospec=True, side_effect=Organisation.bulk_add_members) as add:
+            response = self.client.post(url, {'userId': str(self.other.userId)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        add.assert_called_once_with(self.org, [self.other.pk])
+
+    def test_list_and_detail_on_request(self):
+        detail_url = reverse('organisation_detail', args=[self.org.orgId])
+        self.assertNotIn('memberCount', self.client.get(reverse('organisation_list_create')).data['data']['organisations'][0])
+        self.assertNotIn('memberCount', self.client.get(detail_url).data['data'])
+
+        response = self.client.get(reverse('organisation_list_create') + '?include=memberCount')
+        self.assertEqual(response.data['data']['organisations'][0]['memberCount'], 1)
+
+        # Another user joining shows up straight away: these responses aren't cached
+        self.org.users.add(self.other)
+        response = self.client.get(reverse('organisation_list_create') + '?include=memberCount&limit=5')
+        self.assertEqual(response.data['data']['organisations'][0]['memberCount'], 2)
+        response = self.client.get(detail_url + '?include=memberCount')
+        self.assertEqual(response.data['data']['memberCount'], 2)
+
+    def test_member_list_count_reads_the_column(self):
+        Organisation.objects.filter(pk=self.org.pk).update(member_count=42)
+        url = reverse('add_user_to_organisation', args=[self.org.orgId])
+        with self.assertNumQueries(2):
+            response = self.client.get(url + '?count=true')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['count'], 42)
@@ -0,0 +1,60 @@
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.authentication import get_user_cache
+from users.metrics import REQUEST_DB_QUERIES, REQUEST_DURATION_SECONDS, RESPONSE_SIZE_BYTES
+from users.models import User
+from users.urls import async_urlpatterns
+
+urlpatterns = [
+    path('', include(async_urlpatterns)),
+]
+
+
+class MetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            firstName='John',
+            lastName='Doe',
+            email='john.doe@example.com',
+            password='securepassword',
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.url = reverse('user_detail', args=[self.user.userId])
+
+    def test_records_request_metrics_by_url_name(self):
+        requests = REQUEST_DURATION_SECONDS.count(view='user_detail', method='GET', status=200)
+        queries = REQUEST_DB_QUERIES.sum(view='user_detail')
+        size = RESPONSE_SIZE_BYTES.sum(view='user_detail')
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(REQUEST_DURATION_SECONDS.count(view='user_detail', method='GET', status=200), requests + 1)
+        # The token's user lookup and the view's own
+        self.assertEqual(REQUEST_DB_QUERIES.sum(view='user_detail'), queries + 2)
+        self.assertEqual(RESPONSE_SIZE_BYTES.sum(view='user_detail'), size + len(response.content))
+
+        self.client.credentials()
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertIn('http_request_db_queries_count{view="user_detail"}', response.content.decode())
+
+    @override_settings(ROOT_URLCONF='users.tests.tests_metrics')
+    def test_counts_queries_of_async_views(self):
+        queries = REQUEST_DB_QUERIES.sum(view='user_detail')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(REQUEST_DB_QUERIES.sum(view='user_detail'), queries + 2)
+
+    @override_settings(REQUEST_METRICS={'SLOW_REQUEST_SECONDS': 0, 'TRACE_SAMPLE_RATE': 1})
+    def test_logs_slow_requests_with_sampled_queries(self):
+        with self.assertLogs('users.requests', 'WARNING') as logs:
+            self.client.get(self.url)
+        self.assertIn('(user_detail)', logs.output[0])
+        self.assertIn('2 queries', logs.output[0])
+        self.assertIn('FROM "users_user"', logs.output[0])
@@ -0,0 +1,155 @@
+import uuid
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from organisations.models import Organisation
+
+
+class OrganisationBulkUserAddTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.org = Organisation.objects.create(name="Org 1")
+        self.users = [
+            User.objects.create(email=f'member{i}@example.com', firstName='Member', lastName=str(i))
+            for i in range(3)
+        ]
+        self.org.users.add(self.users[0])
+        self.add_url = reverse('add_user_to_organisation', args=[self.org.orgId])
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_bulk_add_reports_each_user(self):
+        missing = str(uuid.uuid4())
+        user_ids = [str(user.userId) for user in self.users] + [missing, 'not-a-uuid']
+        response = self.client.post(self.add_url, {'userIds': user_ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual((data['added'], data['alreadyMembers'], data['notFound'], data['invalid']), (2, 1, 1, 1))
+        self.assertEqual([result['status'] for result in data['results']], [
+            'already_member', 'added', 'added', 'not_found', 'invalid',
+        ])
+        self.assertEqual(self.org.users.count(), 3)
+
+    def test_bulk_add_from_ndjson_file(self):
+        lines = [f'"{self.users[1].userId}"', f'{{"userId": "{self.users[2].userId}"}}', '']
+        upload = SimpleUploadedFile('members.ndjson', '\n'.join(lines).encode(), content_type='application/x-ndjson')
+        response = self.client.post(self.add_url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['added'], 2)
+        self.assertEqual(self.org.users.count(), 3)
+
+    def test_bulk_add_rejects_malformed_ndjson(self):
+        upload = SimpleUploadedFile('members.ndjson', b'{"userId": \n', content_type='application/x-ndjson')
+        response = self.client.post(self.add_url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_add_members_only(self):
+        user_ids = [str(self.users[1].userId)]
+        self.client.force_authenticate(user=None)
+        response = self.client.post(self.add_url, {'userIds': user_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.users[1])
+        response = self.client.post(self.add_url, {'userIds': user_ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        upload = SimpleUploadedFile('members.ndjson', f'"{self.users[1].userId}"'.encode())
+        response = self.client.post(self.add_url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.org.users.count(), 1)
+
+    def test_bulk_add_stops_reading_file_over_limit(self):
+        lines = [f'"{uuid.uuid4()}"' for _ in range(3)] + ['{"userId": ']
+        upload = SimpleUploadedFile('members.ndjson', '\n'.join(lines).encode())
+        with mock.patch('users.views.MAX_BULK_MEMBERS', 2):
+            response = self.client.post(self.add_url, {'file': upload}, format='multipart')
+        # Rejected for its size before the malformed last line is read
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('At most 2', response.data['message'])
+
+    def test_bulk_add_sends_m2m_changed(self):
+        events = []
+
+        def receiver(sender, action, pk_set, **kwargs):
+            events.append((action, pk_set))
+
+        m2m_changed.connect(receiver, sender=Organisation.users.through)
+        self.addCleanup(m2m_changed.disconnect, receiver, sender=Organisation.users.through)
+
+        self.client.post(self.add_url, {'userIds': [str(self.users[1].userId)]}, format='json')
+        self.assertEqual(events, [
+            ('pre_add', {self.users[1].userId}),
+            ('post_add', {self.users[1].userId}),
+        ])
+
+    def test_bulk_add_uses_constant_queries(self):
+        extra = [
+            User.objects.create(email=f'extra{i}@example.com', firstName='Extra', lastName=str(i))
+            for i in range(20)
+        ]
+        # organisation, users IN, savepoint, organisation lock, memberships
+        # IN, insert, member_count update, release
+        with self.assertNumQueries(8):
+            response = self.client.post(self.add_url, {'userIds': [str(user.userId) for user in extra]}, format='json')
+        self.assertEqual(response.data['data']['added'], 20)
+
+
+class OrganisationMemberListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.org = Organisation.objects.create(name="Org 1")
+        self.users = [
+            User.objects.create(email=f'member{i}@example.com', firstName='Member', lastName=str(i), phone='0')
+            for i in range(5)
+        ]
+        self.org.add_members([user.pk for user in self.users])
+        self.outsider = User.objects.create(email='outsider@example.com', firstName='Out', lastName='Sider')
+        self.url = reverse('add_user_to_organisation', args=[self.org.orgId])
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_pages_through_members_in_user_id_order(self):
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(f'{self.url}?limit=2{cursor}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(user['userId'] for user in response.data['data']['users'])
+            next_cursor = response.data['data']['nextCursor']
+            if next_cursor is None:
+                break
+            cursor = f'&cursor={next_cursor}'
+        self.assertEqual(seen, sorted(str(user.userId) for user in self.users))
+
+    def test_returns_serialized_members_without_email(self):
+        response = self.client.get(self.url)
+        member = response.data['data']['users'][0]
+        self.assertEqual(set(member), {'userId', 'firstName', 'lastName', 'phone'})
+        self.assertNotIn('count', response.data['data'])
+
+    def test_uses_two_queries(self):
+        # membership check, member page
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_count(self):
+        response = self.client.get(f'{self.url}?limit=2&count=true')
+        self.assertEqual(response.data['data']['count'], 5)
+
+    def test_members_only(self):
+        self.client.force_authenticate(user=self.outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.users[0])
+        missing = reverse('add_user_to_organisation', args=[uuid.uuid4()])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(f'{self.url}?cursor=bad').status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,60 @@
+import datetime
+import decimal
+import uuid
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from users import renderers
+from users.models import User
+from users.renderers import FastJSONRenderer, dumps
+from users.serializers import UserSerializer, user_data
+from organisations.models import Organisation
+from organisations.serializers import ORGANISATION_FIELDS, OrganisationSerializer, organisation_list_data
+
+PAYLOAD = {
+    'status': 'success',
+    'data': {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'name': 'Zoë\'s "Organisation" \u2028\u2029 \x00\x1f\x7f \\ / \U0001f600',
+        'description': None,
+        'count': 2 ** 40,
+        'ratio': 0.1,
+        'flags': [True, False],
+        'created': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2024, 5, 1),
+        'price': decimal.Decimal('1.50'),
+        'message': gettext_lazy('This field is required.'),
+    },
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        expected = JSONRenderer().render(PAYLOAD)
+        self.assertEqual(FastJSONRenderer().render(PAYLOAD), expected)
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(dumps(PAYLOAD), expected)
+
+    def test_falls_back_for_values_orjson_rejects(self):
+        payload = {'huge': 2 ** 70, 1: 'non-string key'}
+        self.assertEqual(dumps(payload), JSONRenderer().render(payload))
+
+    def test_indented_output_uses_drf_renderer(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, JSONRenderer().render({'a': 1}, 'application/json; indent=2'))
+
+
+class FastSerializerTests(TestCase):
+    def test_matches_model_serializers(self):
+        user = User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'x')
+        self.assertEqual(user_data(user), UserSerializer(user).data)
+
+        Organisation.objects.create(name='First')
+        Organisation.objects.create(name='Second', description='Zoë')
+        queryset = Organisation.objects.order_by('name')
+        self.assertEqual(
+            organisation_list_data(queryset.values(*ORGANISATION_FIELDS)),
+            OrganisationSerializer(queryset, many=True).data,
+        )
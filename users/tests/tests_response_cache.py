@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users import response_cache
+from users.authentication import get_user_cache
+from users.models import User
+from users.urls import async_urlpatterns
+from organisations.models import Organisation
+
+urlpatterns = [
+    path('', include(async_urlpatterns)),
+]
+
+
+@override_settings(RESPONSE_CACHE={'CACHE_ALIAS': 'responses', 'ENABLED': True})
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            firstName='John',
+            lastName='Doe',
+            email='john.doe@example.com',
+            password='securepassword',
+        )
+        self.org = Organisation.objects.create(name='First')
+        self.org.users.add(self.user)
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.list_url = reverse('organisation_list_create')
+        self.detail_url = reverse('organisation_detail', args=[self.org.orgId])
+
+    def committed(self):
+        # Version bumps wait for COMMIT, which TestCase never reaches
+        return self.captureOnCommitCallbacks(execute=True)
+
+    def names(self):
+        return [org['name'] for org in self.client.get(self.list_url).data['data']['organisations']]
+
+    def test_cached_responses_skip_the_database(self):
+        for url in (self.list_url, self.detail_url):
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        with self.committed():
+            self.org.description = 'Changed'
+            self.org.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['description'], 'Changed')
+
+    def test_organisation_changes_invalidate(self):
+        self.assertEqual(self.names(), ['First'])
+        with self.committed():
+            self.org.name = 'Renamed'
+            self.org.save()
+        self.assertEqual(self.names(), ['Renamed'])
+
+        with self.committed():
+            self.org.delete()
+        self.assertEqual(self.names(), [])
+
+    def test_organisation_changes_skip_member_versions(self):
+        members = [
+            User.objects.create(email=f'member{i}@example.com', firstName='Member', lastName=str(i))
+            for i in range(3)
+        ]
+        with self.committed():
+            self.org.add_members([member.pk for member in members])
+        before = response_cache.get_response_cache().get_many(
+            [response_cache.version_key('user', member.pk) for member in members]
+        )
+
+        self.names()
+        with self.committed():
+            self.org.name = 'Renamed'
+            self.org.save()
+        self.assertEqual(self.names(), ['Renamed'])
+        after = response_cache.get_response_cache().get_many(list(before))
+        self.assertEqual(after, before)
+
+    def test_membership_changes_invalidate(self):
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_200_OK)
+        second = Organisation.objects.create(name='Second')
+        self.names()
+
+        with self.committed():
+            second.users.add(self.user)
+        self.assertEqual(sorted(self.names()), ['First', 'Second'])
+
+        with self.committed():
+            self.user.organisations.remove(second)
+        self.assertEqual(self.names(), ['First'])
+
+        with self.committed():
+            self.org.users.clear()
+        self.assertEqual(self.names(), [])
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_nothing_stale_is_cached_before_commit(self):
+        with self.committed():
+            with transaction.atomic():
+                self.org.users.remove(self.user)
+                # A concurrent request in this window still sees the
+                # committed membership, under the old version token
+                key = response_cache.organisation_detail_key(self.user.pk, self.org.pk)
+                response_cache.store(key, {'stale': True})
+        self.assertNotEqual(response_cache.organisation_detail_key(self.user.pk, self.org.pk), key)
+        self.assertEqual(self.client.get(self.detail_url).status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(RESPONSE_CACHE={'ENABLED': False})
+    def test_disabled(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertNotIn('ETag', response)
+
+    @override_settings(ROOT_URLCONF='users.tests.tests_response_cache')
+    def test_async_views_share_the_cache(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from organisations.models import Organisation
+from organisations import search
+from organisations.search import search_organisations
+
+
+class OrganisationSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create(email='john.doe@example.com', firstName='John', lastName='Doe')
+        self.other = User.objects.create(email='jane.doe@example.com', firstName='Jane', lastName='Doe')
+        self.acme = Organisation.objects.create(name='Acme Rockets', description='Rocket skates')
+        self.widgets = Organisation.objects.create(name='Widget Works', description='Makes rockets for Acme')
+        self.unrelated = Organisation.objects.create(name='Bakery', description='Bread')
+        self.hidden = Organisation.objects.create(name='Acme Secret', description='')
+        for organisation in (self.acme, self.widgets, self.unrelated):
+            organisation.users.add(self.user)
+        self.hidden.users.add(self.other)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('organisation_list_create')
+
+    def names(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [organisation['name'] for organisation in response.data['data']['organisations']]
+
+    def test_ranks_name_matches_first_and_hides_other_organisations(self):
+        self.assertEqual(self.names(self.client.get(self.url, {'q': 'acme'})), ['Acme Rockets', 'Widget Works'])
+
+    def test_matches_substrings(self):
+        self.assertEqual(self.names(self.client.get(self.url, {'q': 'ocket'})), ['Acme Rockets', 'Widget Works'])
+
+    def test_short_queries(self):
+        self.assertEqual(self.names(self.client.get(self.url, {'q': 'Br'})), ['Bakery'])
+
+    def test_limit(self):
+        self.assertEqual(self.names(self.client.get(self.url, {'q': 'acme', 'limit': 1})), ['Acme Rockets'])
+
+    def test_index_follows_edits(self):
+        self.acme.name = 'Globex'
+        self.acme.save()
+        self.assertEqual([org['name'] for org in search_organisations(self.user, 'globex')], ['Globex'])
+        self.widgets.delete()
+        self.assertEqual(search_organisations(self.user, 'widget'), [])
+
+    def test_query_syntax_is_literal(self):
+        self.assertEqual(self.names(self.client.get(self.url, {'q': '"acme" OR *'})), [])
+
+    def test_rejects_empty_query(self):
+        response = self.client.get(self.url, {'q': ' '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@mock.patch.object(search, 'SCAN_LIMIT', 0)
+class OrganisationFullTextSearchTests(OrganisationSearchTests):
+    """The same searches through the SQLite FTS5 table."""
@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from mysite import settings_api
+
+
+@override_settings(
+    MIDDLEWARE=settings_api.MIDDLEWARE,
+    ROOT_URLCONF=settings_api.ROOT_URLCONF,
+    REST_FRAMEWORK=settings_api.REST_FRAMEWORK,
+    TEMPLATES=settings_api.TEMPLATES,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class APIProfileTests(TestCase):
+    def test_stack_is_stripped(self):
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages'):
+            self.assertNotIn(app, settings_api.INSTALLED_APPS)
+        self.assertFalse(any('csrf' in name or 'session' in name for name in settings_api.MIDDLEWARE))
+
+    def test_endpoints_work_without_sessions_or_csrf(self):
+        client = APIClient(enforce_csrf_checks=True)
+        response = client.post(reverse('register_user'), {
+            'firstName': 'John',
+            'lastName': 'Doe',
+            'email': 'john.doe@example.com',
+            'password': 'securepassword',
+            'phone': '1234567890',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('sessionid', response.cookies)
+
+        token = response.json()['data']['accessToken']
+        response = client.get(reverse('organisation_list_create'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(response.json()['data']['organisations']), 1)
+
+    def test_admin_is_not_routed(self):
+        self.assertEqual(self.client.get('/admin/').status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,113 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.metrics import AUTH_THROTTLE_REQUESTS, LOGIN_PASSWORD_HASH_SECONDS
+from users.models import User
+from users.throttling import CacheBucketStore, LocalBucketStore, get_bucket_store, parse_rate, take_token
+
+MD5 = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('5/s'), (5, 1))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+
+    def test_burst_then_refill(self):
+        bucket = None
+        for _ in range(3):
+            bucket, wait = take_token(bucket, 3, 60, now=0)
+            self.assertEqual(wait, 0)
+        bucket, wait = take_token(bucket, 3, 60, now=0)
+        self.assertEqual(wait, 20)
+        # One token back after 20 seconds, not more
+        bucket, wait = take_token(bucket, 3, 60, now=20)
+        self.assertEqual(wait, 0)
+        _, wait = take_token(bucket, 3, 60, now=30)
+        self.assertEqual(wait, 10)
+
+    def test_refill_stops_at_capacity(self):
+        bucket, _ = take_token(None, 2, 60, now=0)
+        bucket, _ = take_token(bucket, 2, 60, now=1000)
+        self.assertEqual(bucket, (1, 1000))
+
+    def test_local_store_evicts_least_recently_used(self):
+        store = LocalBucketStore(max_keys=2)
+        store.take('a', 1, 60)
+        store.take('b', 1, 60)
+        store.take('a', 1, 60)
+        store.take('c', 1, 60)
+        self.assertEqual(list(store.buckets), ['a', 'c'])
+
+    def test_cache_store(self):
+        store = CacheBucketStore('default')
+        store.clear()
+        self.assertEqual(store.take('login_email:john doe@example.com', 1, 60), 0)
+        self.assertGreater(store.take('login_email:john doe@example.com', 1, 60), 59)
+        self.assertEqual(store.take('login_email:jane@example.com', 1, 60), 0)
+
+
+@override_settings(PASSWORD_HASHERS=MD5, AUTH_THROTTLE={
+    'RATES': {'login_ip': '100/min', 'login_email': '3/min', 'register_ip': '2/min'},
+})
+class ThrottledViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.login_url = reverse('login_user')
+        self.user = User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'securepassword')
+
+    def tearDown(self):
+        get_bucket_store().clear()
+
+    def login(self, email='john.doe@example.com', password='wrong', ip='10.0.0.1'):
+        return self.client.post(self.login_url, {'email': email, 'password': password}, format='json', REMOTE_ADDR=ip)
+
+    def test_login_throttled_per_email_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+        hashes = LOGIN_PASSWORD_HASH_SECONDS.count(outcome='success') + LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure')
+        throttled = AUTH_THROTTLE_REQUESTS.value(scope='login_email', outcome='throttled')
+        # Emails are case-insensitive, and the right password doesn't help
+        response = self.login(email='John.Doe@Example.com', password='securepassword', ip='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(
+            LOGIN_PASSWORD_HASH_SECONDS.count(outcome='success') + LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure'),
+            hashes,
+        )
+        self.assertEqual(AUTH_THROTTLE_REQUESTS.value(scope='login_email', outcome='throttled'), throttled + 1)
+
+        # Other accounts are unaffected
+        self.assertEqual(self.login(email='jane.doe@example.com').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_THROTTLE={'RATES': {'login_ip': '5/min'}})
+    def test_login_throttled_per_ip(self):
+        for n in range(5):
+            self.assertEqual(self.login(email=f'user{n}@example.com').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login(email='user5@example.com').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        response = self.login(password='securepassword', ip='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_register_throttled_per_ip(self):
+        url = reverse('register_user')
+        responses = [self.client.post(url, {'email': 'x'}, format='json', REMOTE_ADDR='10.0.0.1') for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [422, 422, 429])
+
+    @override_settings(AUTH_THROTTLE={'ENABLED': False, 'RATES': {'login_email': '1/min'}})
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_distributed_attack_on_one_account(self):
+        # 2000 attackers, one attempt each from its own address: only the
+        # account's burst of 3 reaches password hashing
+        before = LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure')
+        statuses = {}
+        for attacker in range(2000):
+            code = self.login(ip=f'10.{attacker // 256}.{attacker % 256}.1').status_code
+            statuses[code] = statuses.get(code, 0) + 1
+        self.assertEqual(statuses, {401: 3, 429: 1997})
+        self.assertEqual(LOGIN_PASSWORD_HASH_SECONDS.count(outcome='failure'), before + 3)
@@ -1,10 +1,14 @@
-from django.test import TestCase
+import json
+import uuid
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from users.models import User
 from organisations.models import Organisation
 
+# Throttling has its own tests (tests_throttling.py)
+@override_settings(AUTH_THROTTLE={'ENABLED': False})
 class UserRegistrationTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -129,6 +133,34 @@ class UserRegistrationTests(TestCase):
         self.assertEqual(response_duplicate.data['errors'][0]['field'], 'email')
         self.assertEqual(response_duplicate.data['errors'][0]['message'], 'user with this email already exists.')
 
+    def test_register_user_query_count(self):
+        data = {
+            'firstName': 'John',
+            'lastName': 'Doe',
+            'email': 'john.doe@example.com',
+            'password': 'securepassword',
+            'phone': '1234567890'
+        }
+        # SAVEPOINT, the user, organisation and membership INSERTs, the
+        # member_count UPDATE, RELEASE
+        with self.assertNumQueries(6):
+            response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Organisation.objects.filter(users__email=data['email']).exists())
+
+    def test_register_user_duplicate_email_rolls_back(self):
+        User.objects.create_user(email='john.doe@example.com', firstName='John', lastName='Doe', password='x')
+        data = {
+            'firstName': 'Jane',
+            'lastName': 'Doe',
+            'email': 'john.doe@example.com',
+            'password': 'securepassword',
+            'phone': '1234567890'
+        }
+        response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertFalse(Organisation.objects.filter(name="Jane's Organisation").exists())
+
     def test_register_user_default_organisation_name(self):
         data = {
             'firstName': 'John',
@@ -149,6 +181,7 @@ class UserRegistrationTests(TestCase):
         Organisation.objects.all().delete()
         
         
+@override_settings(AUTH_THROTTLE={'ENABLED': False})
 class UserLoginTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -276,6 +309,42 @@ class OrganisationTests(TestCase):
         self.assertEqual(response.data['data']['organisations'][0]['name'], org1.name)
         self.assertEqual(response.data['data']['organisations'][1]['name'], org2.name)
 
+    def test_list_organisations_paginated(self):
+        self.client.force_authenticate(user=self.user)
+        for i in range(5):
+            Organisation.objects.create(name=f"Org {i}").users.add(self.user)
+
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(self.list_url, {'limit': 2, 'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            page = response.data['data']['organisations']
+            self.assertLessEqual(len(page), 2)
+            seen.extend(org['orgId'] for org in page)
+            cursor = response.data['data']['nextCursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_list_organisations_invalid_cursor(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor!'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_organisations_streaming(self):
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Organisation.objects.create(name=f"Org {i}").users.add(self.user)
+
+        response = self.client.get(self.list_url, {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(payload['status'], 'success')
+        self.assertEqual(len(payload['data']['organisations']), 3)
+
     def test_create_organisation_missing_name(self):
         self.client.force_authenticate(user=self.user)
         data = {
@@ -321,6 +390,21 @@ class OrganisationDetailViewTests(TestCase):
         response = self.client.get(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_membership_check_is_a_single_query(self):
+        self.org.users.add(*[
+            User.objects.create(email=f'member{i}@example.com', firstName='Member', lastName=str(i))
+            for i in range(20)
+        ])
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_view_missing_organisation_details(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('organisation_detail', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     def tearDown(self):
         User.objects.all().delete()
         Organisation.objects.all().delete()
\ No newline at end of file
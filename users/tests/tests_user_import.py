@@ -0,0 +1,135 @@
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import User
+from organisations.models import Organisation
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ImportUsersCommandTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content)
+        return str(path)
+
+    def test_import_csv(self):
+        path = self.write('users.csv', (
+            'firstName,lastName,email,password,phone\n'
+            'John,Doe,john.doe@example.com,securepassword,1234567890\n'
+            'Jane,Doe,jane.doe@example.com,anotherpassword,9876543210\n'
+            ',Doe,nameless@example.com,password,555\n'
+        ))
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('importusers', path, '--workers', '2', '--chunk-size', '2', stdout=stdout, stderr=stderr)
+
+        self.assertEqual(User.objects.count(), 2)
+        user = User.objects.get(email='john.doe@example.com')
+        self.assertTrue(user.check_password('securepassword'))
+        self.assertEqual(user.organisations.get().name, "John's Organisation")
+        errors = [json.loads(line) for line in stderr.getvalue().splitlines()]
+        self.assertEqual(errors, [{'row': 4, 'field': 'firstName', 'message': 'This field is required.'}])
+
+    def test_import_ndjson_reports_bad_rows(self):
+        User.objects.create_user('taken@example.com', 'Taken', 'User', 'password')
+        path = self.write('users.ndjson', '\n'.join([
+            json.dumps({'firstName': 'John', 'lastName': 'Doe', 'email': 'john.doe@example.com',
+                        'password': 'securepassword', 'phone': '1234567890'}),
+            '{not json',
+            json.dumps({'firstName': 'Again', 'lastName': 'Doe', 'email': 'john.doe@example.com',
+                        'password': 'securepassword', 'phone': '1234567890'}),
+            json.dumps({'firstName': 'Taken', 'lastName': 'Doe', 'email': 'taken@example.com',
+                        'password': 'securepassword', 'phone': '1234567890'}),
+        ]))
+        stderr = io.StringIO()
+        call_command('importusers', path, '--workers', '0', stdout=io.StringIO(), stderr=stderr)
+
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Organisation.objects.count(), 1)
+        rows = [json.loads(line)['row'] for line in stderr.getvalue().splitlines()]
+        self.assertEqual(rows, [2, 3, 4])
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class UserBulkRegistrationViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('bulk_register_users')
+        self.admin = User.objects.create_superuser('admin@example.com', 'Admin', 'User', 'password')
+
+    def test_requires_admin(self):
+        user = User.objects.create_user('john.doe@example.com', 'John', 'Doe', 'password')
+        self.client.force_authenticate(user=user)
+        response = self.client.post(self.url, {'users': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_register_json(self):
+        self.client.force_authenticate(user=self.admin)
+        users = [
+            {'firstName': 'John', 'lastName': 'Doe', 'email': 'john.doe@example.com',
+             'password': 'securepassword', 'phone': '1234567890'},
+            {'firstName': 'Jane', 'lastName': 'Doe', 'email': 'not-an-email',
+             'password': 'securepassword', 'phone': '1234567890'},
+        ]
+        response = self.client.post(self.url, {'users': users}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['created'], 1)
+        self.assertEqual(response.data['data']['errors'], [
+            {'row': 2, 'field': 'email', 'message': 'Enter a valid email address.'},
+        ])
+
+    def test_bulk_register_csv_upload(self):
+        self.client.force_authenticate(user=self.admin)
+        upload = SimpleUploadedFile('users.csv', (
+            b'firstName,lastName,email,password,phone\n'
+            b'John,Doe,john.doe@example.com,securepassword,1234567890\n'
+        ), content_type='text/csv')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['created'], 1)
+        self.assertTrue(User.objects.filter(email='john.doe@example.com').exists())
+
+    def test_bulk_register_gzipped_csv_upload(self):
+        self.client.force_authenticate(user=self.admin)
+        upload = SimpleUploadedFile('users.csv.gz', gzip.compress(
+            b'firstName,lastName,email,password,phone\n'
+            b'John,Doe,john.doe@example.com,securepassword,1234567890\n'
+        ), content_type='application/gzip')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['created'], 1)
+
+    def test_bulk_register_rejects_corrupt_gzip(self):
+        self.client.force_authenticate(user=self.admin)
+        upload = SimpleUploadedFile('users.csv.gz', b'firstName,lastName\n', content_type='application/gzip')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_register_rejects_unreadable_files(self):
+        self.client.force_authenticate(user=self.admin)
+        for name, content in [
+            ('users.csv', b'firstName,lastName\n\xff\xfe,Doe\n'),
+            ('users.ndjson', b'{"firstName": "\xff"}\n'),
+            # Past csv.field_size_limit()
+            ('users.csv', b'firstName,lastName\n' + b'x' * 200000 + b',Doe\n'),
+        ]:
+            upload = SimpleUploadedFile(name, content)
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, name)
@@ -0,0 +1,182 @@
+"""
+Token-bucket throttles for the login and registration views. DRF checks
+them before the view runs, so a rejected request never reaches password
+hashing.
+
+Each scope has a rate such as '10/min': its buckets hold up to 10 tokens
+and refill at 10 a minute, so a client can burst 10 requests and then make
+one every 6 seconds. Buckets are kept in a bounded LRU in each process, or
+in a Django cache shared by every process (AUTH_THROTTLE['CACHE_ALIAS']).
+The shared store reads and writes a bucket without a lock, so two processes
+can occasionally both take its last token.
+"""
+import functools
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import AUTH_THROTTLE_REQUESTS
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Optional django.core.cache alias shared between processes
+    'CACHE_ALIAS': None,
+    # Buckets kept in each process's LRU; an evicted bucket starts full again
+    'MAX_KEYS': 100000,
+    # Rate per scope; None turns a scope off
+    'RATES': {},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_throttle_settings():
+    return {**DEFAULTS, **getattr(settings, 'AUTH_THROTTLE', {})}
+
+
+@functools.lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'10/min' -> (10, 60): bucket capacity and seconds to refill it."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period[0]]
+
+
+def take_token(bucket, capacity, period, now):
+    """
+    Refill `bucket`, a (tokens, updated) pair or None for a full one, up to
+    `now` and take a token from it. Return the new bucket and the seconds
+    until a token is available, 0 if one was taken.
+    """
+    if bucket is None:
+        tokens = capacity
+    else:
+        tokens, updated = bucket
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) * period / capacity
+
+
+class LocalBucketStore:
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, period):
+        now = time.monotonic()
+        with self.lock:
+            bucket, wait = take_token(self.buckets.pop(key, None), capacity, period, now)
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheBucketStore:
+    key_prefix = 'users:throttle:'
+
+    def __init__(self, cache_alias):
+        self.cache = caches[cache_alias]
+
+    def take(self, key, capacity, period):
+        # Keys hold client-supplied emails; hashing keeps them valid for
+        # every cache backend
+        key = self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+        bucket, wait = take_token(self.cache.get(key), capacity, period, time.time())
+        # An untouched bucket is full again after `period` seconds
+        self.cache.set(key, bucket, math.ceil(period))
+        return wait
+
+    def clear(self):
+        self.cache.clear()
+
+
+_bucket_store = None
+_bucket_store_lock = threading.Lock()
+
+
+def get_bucket_store():
+    global _bucket_store
+    if _bucket_store is None:
+        with _bucket_store_lock:
+            if _bucket_store is None:
+                options = get_throttle_settings()
+                if options['CACHE_ALIAS']:
+                    _bucket_store = CacheBucketStore(options['CACHE_ALIAS'])
+                else:
+                    _bucket_store = LocalBucketStore(options['MAX_KEYS'])
+    return _bucket_store
+
+
+def reset_bucket_store(*, setting, **kwargs):
+    global _bucket_store
+    if setting in ('AUTH_THROTTLE', 'CACHES'):
+        _bucket_store = None
+
+
+setting_changed.connect(reset_bucket_store)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def get_key(self, request):
+        """The bucket `request` draws from, or None to let it through."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        options = get_throttle_settings()
+        rate = options['RATES'].get(self.scope)
+        if not options['ENABLED'] or not rate:
+            return True
+        key = self.get_key(request)
+        if key is None:
+            return True
+
+        capacity, period = parse_rate(rate)
+        self.retry_after = get_bucket_store().take(f'{self.scope}:{key}', capacity, period)
+        allowed = self.retry_after == 0
+        AUTH_THROTTLE_REQUESTS.inc(scope=self.scope, outcome='allowed' if allowed else 'throttled')
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    def get_key(self, request):
+        # REMOTE_ADDR, or X-Forwarded-For as REST_FRAMEWORK['NUM_PROXIES'] allows
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    def get_key(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            # Nothing to authenticate against, so no password is hashed
+            return None
+        return email.strip().lower()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailThrottle):
+    scope = 'login_email'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
@@ -1,14 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     OrganisationView,
     OrganisationDetailView,
     OrganisationUserAddView,
     UserRegistrationView,
+    UserBulkRegistrationView,
     UserLoginView,
     UserDetailView,
+    UserBatchView,
+    OrganisationBatchView,
+    metrics_view,
 )
 
-urlpatterns = [
+sync_urlpatterns = [
     path('auth/register', UserRegistrationView.as_view(), name='register_user'),
     path('auth/login', UserLoginView.as_view(), name='login_user'),
     path('api/users/<uuid:id>', UserDetailView.as_view(), name='user_detail'),
@@ -16,3 +21,39 @@ urlpatterns = [
     path('api/organisations/<uuid:id>', OrganisationDetailView.as_view(), name='organisation_detail'),
     path('api/organisations/<uuid:id>/users', OrganisationUserAddView.as_view(), name='add_user_to_organisation'),
 ]
+
+
+def get_async_urlpatterns():
+    # Same routes and names, served by coroutine views under ASGI. Imported
+    # on demand so WSGI deployments never load users.async_views.
+    from .async_views import (
+        AsyncOrganisationView,
+        AsyncOrganisationDetailView,
+        AsyncOrganisationUserAddView,
+        AsyncUserRegistrationView,
+        AsyncUserLoginView,
+        AsyncUserDetailView,
+    )
+
+    return [
+        path('auth/register', AsyncUserRegistrationView.as_view(), name='register_user'),
+        path('auth/login', AsyncUserLoginView.as_view(), name='login_user'),
+        path('api/users/<uuid:id>', AsyncUserDetailView.as_view(), name='user_detail'),
+        path('api/organisations', AsyncOrganisationView.as_view(), name='organisation_list_create'),
+        path('api/organisations/<uuid:id>', AsyncOrganisationDetailView.as_view(), name='organisation_detail'),
+        path('api/organisations/<uuid:id>/users', AsyncOrganisationUserAddView.as_view(), name='add_user_to_organisation'),
+    ]
+
+
+def __getattr__(name):
+    if name == 'async_urlpatterns':
+        return get_async_urlpatterns()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+urlpatterns = (get_async_urlpatterns() if getattr(settings, 'ASYNC_API_VIEWS', False) else sync_urlpatterns) + [
+    path('auth/register/batch', UserBulkRegistrationView.as_view(), name='bulk_register_users'),
+    path('api/users/batch', UserBatchView.as_view(), name='user_batch'),
+    path('api/organisations/batch', OrganisationBatchView.as_view(), name='organisation_batch'),
+    path('metrics', metrics_view, name='metrics'),
+]
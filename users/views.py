@@ -1,58 +1,125 @@
+import csv
+import gzip
+import hmac
+import itertools
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from .models import User
-from .serializers import UserSerializer, RegistrationSerializer
+from .serializers import DUPLICATE_EMAIL_MESSAGE, USER_FIELDS, RegistrationSerializer, user_data
+from .pagination import InvalidPageParams, get_page_params, is_paginated, keyset_page, keyset_queryset
+from .streaming import STREAM_CHUNK_SIZE, streaming_json_response
+from .ndjson import NDJSONError, iter_ndjson
+from .importers import UserImporter, detect_format, iter_rows
+from .metrics import REGISTRY
+from .exceptions import UnprocessableEntity
+from .throttling import LoginEmailThrottle, LoginIPThrottle, RegisterIPThrottle
+from . import response_cache
 from organisations.models import Organisation
+from organisations import search
 from rest_framework_simplejwt.tokens import RefreshToken
-from organisations.serializers import OrganisationCreateSerializer, OrganisationDetailSerializer, OrganisationSerializer
+from organisations.serializers import (
+    ORGANISATION_FIELDS, OrganisationCreateSerializer, organisation_data, organisation_fields, organisation_list_data,
+)
 
 class UserRegistrationView(APIView):
+    throttle_classes = [RegisterIPThrottle]
+
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
-        if serializer.is_valid():
-            user = serializer.save()
+        if not serializer.is_valid():
+            raise UnprocessableEntity(serializer.errors)
+
+        # Hash before opening the transaction; inside it only the three
+        # INSERTs run (user, default organisation, membership)
+        user = User.objects.build_user(**serializer.validated_data)
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
 
-            # Create default organisation
-            org_name = f"{user.firstName}'s Organisation"
-            organisation = Organisation.objects.create(name=org_name)
-            organisation.users.add(user)
-            organisation.save()
+                # Create default organisation
+                org_name = f"{user.firstName}'s Organisation"
+                organisation = Organisation.objects.create(name=org_name)
+                organisation.add_members([user.pk])
+        except IntegrityError:
+            # The only unique column not generated here is email
+            raise UnprocessableEntity({'email': [DUPLICATE_EMAIL_MESSAGE]})
 
-            # Generate JWT token
-            refresh = RefreshToken.for_user(user)
+        # Generate JWT token
+        refresh = RefreshToken.for_user(user)
+        return Response({
+            'status': 'success',
+            'message': 'Registration successful',
+            'data': {
+                'accessToken': str(refresh.access_token),
+                'user': user_data(user)
+            }
+        }, status=status.HTTP_201_CREATED)
+
+MAX_BULK_REGISTRATIONS = 1000
+
+
+class UserBulkRegistrationView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        if 'file' in request.FILES:
+            upload = request.FILES['file']
+            stream = gzip.GzipFile(fileobj=upload) if upload.name.lower().endswith('.gz') else upload
+            rows = iter_rows(stream, detect_format(upload.name))
+        else:
+            users = request.data.get('users')
+            if not isinstance(users, list):
+                return Response({
+                    'status': 'Bad Request',
+                    'message': 'users must be a list'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            rows = enumerate(users, 1)
+
+        try:
+            rows = list(itertools.islice(rows, MAX_BULK_REGISTRATIONS + 1))
+        except (EOFError, gzip.BadGzipFile, UnicodeDecodeError, csv.Error) as e:
+            # A corrupt gzip stream, non-UTF-8 bytes or malformed CSV
             return Response({
-                'status': 'success',
-                'message': 'Registration successful',
-                'data': {
-                    'accessToken': str(refresh.access_token),
-                    'user': UserSerializer(user).data
-                }
-            }, status=status.HTTP_201_CREATED)
-        
-        # Handle validation errors (422 status code)
-        if serializer.errors:
-            errors = []
-            for field, messages in serializer.errors.items():
-                for message in messages:
-                    errors.append({
-                        'field': field,
-                        'message': message
-                    })
-            return Response({
-                'errors': errors
-            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-        
-        # If serializer is not valid and no specific error is caught, return 400 Bad Request
+                'status': 'Bad Request',
+                'message': f'Could not read file: {e}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_BULK_REGISTRATIONS:
+            return Response({
+                'status': 'Bad Request',
+                'message': f'At most {MAX_BULK_REGISTRATIONS} users can be registered at once'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Hash in this process: for at most MAX_BULK_REGISTRATIONS rows a
+        # process pool costs more to start than it saves, and forking here
+        # would copy the web worker mid-request
+        with UserImporter(workers=0) as importer:
+            result = importer.run(rows)
+
         return Response({
-            'status': 'Bad request',
-            'message': 'Registration unsuccessful',
-        }, status=status.HTTP_400_BAD_REQUEST)
+            'status': 'success',
+            'message': 'Users imported',
+            'data': {
+                'rows': result.rows,
+                'created': result.created,
+                'failed': result.failed,
+                'errors': result.errors,
+            }
+        }, status=status.HTTP_200_OK)
+
 
 class UserLoginView(APIView):
+    # Checked before authenticate() hashes the password
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
+
     def post(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
@@ -75,7 +142,7 @@ class UserLoginView(APIView):
                 'message': 'Login successful',
                 'data': {
                     'accessToken': str(refresh.access_token),
-                    'user': UserSerializer(user).data
+                    'user': user_data(user)
                 }
             }, status=status.HTTP_200_OK)
 
@@ -90,14 +157,13 @@ class UserDetailView(APIView):
 
     def get(self, request, id):
         try:
-            user = User.objects.get(userId=id)
+            user = User.objects.only(*USER_FIELDS).get(userId=id)
 
             if user == request.user:
-                serializer = UserSerializer(user)
                 return Response({
                     'status': 'success',
                     'message': 'User retrieved successfully',
-                    'data': serializer.data
+                    'data': user_data(user)
                 }, status=status.HTTP_200_OK)
             else:
                 return Response({
@@ -116,23 +182,78 @@ class OrganisationView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        if 'q' in request.query_params:
+            return self.search(request)
+
         try:
-            # Fetch organisations related to the logged-in user
-            organisations = request.user.organisations.all()
-            serializer = OrganisationSerializer(organisations, many=True)
+            limit, cursor = get_page_params(request.query_params)
+        except InvalidPageParams as e:
             return Response({
+                'status': 'Bad Request',
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        streaming = request.query_params.get('stream') in ('1', 'true')
+        fields = organisation_fields(request.query_params)
+        key = None
+        # Member counts change with other users' memberships, which don't
+        # retire this user's cached responses
+        if response_cache.is_enabled() and not streaming and fields is ORGANISATION_FIELDS:
+            key = response_cache.organisation_list_key(request.user.pk, request.query_params)
+            entry = response_cache.get(key)
+            if entry is not None:
+                return response_cache.respond(request, *entry)
+
+        # Fetch organisations related to the logged-in user
+        organisations = request.user.organisations.values(*fields)
+
+        if streaming:
+            # Encode rows as they come off a server-side cursor so memory
+            # stays flat however many organisations the user belongs to
+            rows = (
+                organisation_data(organisation)
+                for organisation in keyset_queryset(organisations, 'orgId', cursor).iterator(chunk_size=STREAM_CHUNK_SIZE)
+            )
+            return streaming_json_response({
                 'status': 'success',
                 'message': 'Organisations retrieved successfully',
                 'data': {
-                    'organisations': serializer.data
+                    'organisations': None
                 }
-            }, status=status.HTTP_200_OK)
-        except Exception as e:
+            }, ('data', 'organisations'), rows)
+
+        data = {}
+        if is_paginated(request.query_params):
+            organisations, data['nextCursor'] = keyset_page(organisations, 'orgId', limit, cursor)
+        else:
+            # The planner's row order depends on which index it picks
+            organisations = organisations.order_by('name', 'orgId')
+
+        data = {
+            'status': 'success',
+            'message': 'Organisations retrieved successfully',
+            'data': {'organisations': organisation_list_data(organisations), **data}
+        }
+        if key is not None:
+            return response_cache.respond(request, response_cache.store_organisation_list(key, data), data)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def search(self, request):
+        try:
+            limit, _ = get_page_params(request.query_params, default_limit=search.DEFAULT_LIMIT, max_limit=search.MAX_LIMIT)
+            organisations = search.search_organisations(request.user, request.query_params['q'], limit)
+        except (InvalidPageParams, search.InvalidSearch) as e:
             return Response({
-                'status': 'error',
-                'message': 'Failed to retrieve organisations',
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'status': 'Bad Request',
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Ranked results aren't cached or paged: refine the query instead
+        return Response({
+            'status': 'success',
+            'message': 'Organisations retrieved successfully',
+            'data': {'organisations': organisation_list_data(organisations)}
+        }, status=status.HTTP_200_OK)
 
     def post(self, request):
         serializer = OrganisationCreateSerializer(data=request.data)
@@ -163,17 +284,32 @@ class OrganisationDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, id):
+        fields = organisation_fields(request.query_params)
+        key = None
+        if response_cache.is_enabled() and fields is ORGANISATION_FIELDS:
+            # Only successful responses are cached, so a hit also proves
+            # membership
+            key = response_cache.organisation_detail_key(request.user.pk, id)
+            entry = response_cache.get(key)
+            if entry is not None:
+                return response_cache.respond(request, *entry)
+
         try:
-            organisation = Organisation.objects.get(orgId=id)
-            
+            # Fetch the organisation and the membership check in one query
+            organisation = Organisation.objects.with_membership(request.user).values(
+                *fields, 'is_member'
+            ).get(orgId=id)
+
             # Check if the requesting user belongs to the organisation
-            if request.user in organisation.users.all():
-                serializer = OrganisationDetailSerializer(organisation)
-                return Response({
+            if organisation['is_member']:
+                data = {
                     'status': 'success',
                     'message': 'Organisation retrieved successfully',
-                    'data': serializer.data
-                }, status=status.HTTP_200_OK)
+                    'data': organisation_data(organisation)
+                }
+                if key is not None:
+                    return response_cache.respond(request, response_cache.store(key, data), data)
+                return Response(data, status=status.HTTP_200_OK)
             else:
                 return Response({
                     'status': 'Forbidden',
@@ -187,8 +323,83 @@ class OrganisationDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
             
             
+MAX_BULK_MEMBERS = 10000
+
+
+def read_user_ids(request):
+    # A bulk request sends either a `userIds` list or an uploaded NDJSON file
+    # whose lines are user ids or {"userId": ...} objects
+    if 'file' in request.FILES:
+        # Stop reading once the file is known to be over the limit
+        user_ids = {}
+        for line_no, value in iter_ndjson(request.FILES['file']):
+            if isinstance(value, dict):
+                value = value.get('userId')
+            if not isinstance(value, str):
+                raise NDJSONError(line_no, 'expected a userId')
+            user_ids[value] = None
+            if len(user_ids) > MAX_BULK_MEMBERS:
+                break
+        return list(user_ids)
+
+    user_ids = request.data.get('userIds')
+    if not isinstance(user_ids, list) or not all(isinstance(value, str) for value in user_ids):
+        raise ValueError('userIds must be a list of strings')
+    return user_ids
+
+
 class OrganisationUserAddView(APIView):
+    def get_permissions(self):
+        # Adding a single member is open; listing members and bulk adds are
+        # for members only (see bulk_add)
+        if self.request.method == 'GET':
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
+    def get(self, request, id):
+        try:
+            limit, cursor = get_page_params(request.query_params)
+        except InvalidPageParams as e:
+            return Response({
+                'status': 'Bad Request',
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            organisation = Organisation.objects.with_membership(request.user).values('is_member', 'member_count').get(orgId=id)
+        except Organisation.DoesNotExist:
+            return Response({
+                'status': 'Not Found',
+                'message': 'Organisation not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not organisation['is_member']:
+            return Response({
+                'status': 'Forbidden',
+                'message': 'You do not have permission to view this organisation'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        memberships = Organisation.users.through.objects.filter(organisation_id=id)
+        # One join, walked in the order of the (organisation_id, user_id)
+        # index; ordering by users_user.userId would sort every member first
+        members = memberships.select_related('user').only(*[f'user__{field}' for field in USER_FIELDS])
+        page, next_cursor = keyset_page(members, 'user_id', limit, cursor)
+        data = {'users': [user_data(membership.user) for membership in page], 'nextCursor': next_cursor}
+
+        if request.query_params.get('count') in ('1', 'true'):
+            # Kept up to date by the m2m_changed receivers, so no COUNT(*)
+            data['count'] = organisation['member_count']
+
+        return Response({
+            'status': 'success',
+            'message': 'Members retrieved successfully',
+            'data': data
+        }, status=status.HTTP_200_OK)
+
     def post(self, request, id):
+        if 'userIds' in request.data or 'file' in request.FILES:
+            return self.bulk_add(request, id)
+
         try:
             organisation = Organisation.objects.get(orgId=id)
 
@@ -204,8 +415,9 @@ class OrganisationUserAddView(APIView):
             # Check if the userId exists
             user = User.objects.get(userId=userId)
 
-            # Add user to the organisation
-            organisation.users.add(user)
+            # Add user to the organisation, under the same lock as bulk adds
+            # so concurrent adds of one user count them once
+            organisation.bulk_add_members([user.pk])
 
             return Response({
                 'status': 'success',
@@ -224,9 +436,183 @@ class OrganisationUserAddView(APIView):
                 'message': 'User not found'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        except Exception as e:
+    def bulk_add(self, request, id):
+        # Bulk adds are for members of the organisation only
+        if not request.user.is_authenticated:
+            self.permission_denied(request)
+
+        try:
+            organisation = Organisation.objects.with_membership(request.user).get(orgId=id)
+        except Organisation.DoesNotExist:
+            return Response({
+                'status': 'Not found',
+                'message': 'Organisation not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not organisation.is_member:
+            return Response({
+                'status': 'Forbidden',
+                'message': 'You do not have permission to add users to this organisation'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            user_ids = read_user_ids(request)
+        except ValueError as e:
+            return Response({
+                'status': 'Bad Request',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # De-duplicate while keeping the caller's order for the report
+        user_ids = list(dict.fromkeys(user_ids))
+        if len(user_ids) > MAX_BULK_MEMBERS:
+            return Response({
+                'status': 'Bad Request',
+                'message': f'At most {MAX_BULK_MEMBERS} userIds can be added at once'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        parsed = {}
+        for user_id in user_ids:
+            try:
+                parsed[user_id] = uuid.UUID(user_id)
+            except ValueError:
+                pass
+
+        added, members, missing = organisation.bulk_add_members(parsed.values())
+
+        results = []
+        for user_id in user_ids:
+            value = parsed.get(user_id)
+            if value is None:
+                result = 'invalid'
+            elif value in added:
+                result = 'added'
+            elif value in members:
+                result = 'already_member'
+            else:
+                result = 'not_found'
+            results.append({'userId': user_id, 'status': result})
+
+        return Response({
+            'status': 'success',
+            'message': 'Users added to organisation successfully',
+            'data': {
+                'added': len(added),
+                'alreadyMembers': len(members),
+                'notFound': len(missing),
+                'invalid': len(user_ids) - len(parsed),
+                'results': results,
+            }
+        }, status=status.HTTP_200_OK)
+
+
+MAX_BATCH_IDS = 100
+
+
+def read_batch_ids(request):
+    # GET takes ?ids=a,b or repeated ?ids=; POST a body of {"ids": [...]}
+    if request.method == 'GET':
+        ids = [value for param in request.query_params.getlist('ids') for value in param.split(',') if value]
+    else:
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(value, str) for value in ids):
+            raise ValueError('ids must be a list of strings')
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError('ids is required')
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f'At most {MAX_BATCH_IDS} ids can be fetched at once')
+    return ids
+
+
+class BatchView(APIView):
+    """
+    Fetch up to MAX_BATCH_IDS objects in one request and one IN query,
+    reporting each id as found, forbidden, missing or invalid.
+    """
+    permission_classes = [IsAuthenticated]
+    id_field = None
+    message = None
+
+    def fetch(self, request, pks):
+        """Map each existing pk to its data, or to None if the caller may not see it."""
+        raise NotImplementedError
+
+    def get(self, request):
+        return self.batch(request)
+
+    def post(self, request):
+        return self.batch(request)
+
+    def batch(self, request):
+        try:
+            ids = read_batch_ids(request)
+        except ValueError as e:
             return Response({
-                'status': 'error',
-                'message': 'Failed to add user to organisation',
-                'error': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+                'status': 'Bad Request',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        parsed = {}
+        for value in ids:
+            try:
+                parsed[value] = uuid.UUID(value)
+            except ValueError:
+                pass
+
+        found = self.fetch(request, set(parsed.values()))
+        results = []
+        for value in ids:
+            pk = parsed.get(value)
+            if pk is None:
+                result = {'status': 'invalid'}
+            elif pk not in found:
+                result = {'status': 'missing'}
+            elif found[pk] is None:
+                result = {'status': 'forbidden'}
+            else:
+                result = {'status': 'found', 'data': found[pk]}
+            results.append({self.id_field: value, **result})
+
+        return Response({
+            'status': 'success',
+            'message': self.message,
+            'data': {'results': results}
+        }, status=status.HTTP_200_OK)
+
+
+class UserBatchView(BatchView):
+    id_field = 'userId'
+    message = 'Users retrieved successfully'
+
+    def fetch(self, request, pks):
+        # Same rule as UserDetailView: users can only see themselves
+        users = User.objects.filter(userId__in=pks).only(*USER_FIELDS)
+        return {user.userId: user_data(user) if user == request.user else None for user in users}
+
+
+class OrganisationBatchView(BatchView):
+    id_field = 'orgId'
+    message = 'Organisations retrieved successfully'
+
+    def fetch(self, request, pks):
+        # Same rule as OrganisationDetailView: members only
+        organisations = Organisation.objects.with_membership(request.user).filter(orgId__in=pks).values(
+            *ORGANISATION_FIELDS, 'is_member'
+        )
+        return {
+            organisation['orgId']: organisation_data(organisation) if organisation['is_member'] else None
+            for organisation in organisations
+        }
+
+
+def metrics_view(request):
+    # Prometheus text exposition of users.metrics.REGISTRY. Hidden unless a
+    # METRICS_TOKEN is configured, so a deployment never exposes it by default
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')